@@ -0,0 +1,19 @@
+from django.db import connection
+
+
+def upsert(model, rows, unique_fields, update_fields, batch_size=None):
+    """
+    Insert ``rows`` (unsaved ``model`` instances), updating ``update_fields`` where a row already exists.
+
+    ``unique_fields`` name the unique constraint that identifies an existing
+    row. They are passed as the conflict target where the backend needs one;
+    MySQL upserts on any unique key and rejects an explicit target. Like any
+    bulk_create, this skips save() and model signals.
+    """
+    model.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields if connection.features.supports_update_conflicts_with_target else None,
+        update_fields=update_fields,
+    )
@@ -96,6 +96,25 @@ DATABASES = {
 
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+# The in-process cache is only invalidated in the worker that made a change.
+# With several gunicorn workers, point this at a shared backend, e.g.
+#     'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#     'LOCATION': 'redis://127.0.0.1:6379',
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ebike-default',
+    }
+}
+
+# Seconds a cached customer catalog page lives
+CATALOG_CACHE_TTL = 60
+# Seconds a cached cart line count lives
+CART_COUNT_CACHE_TTL = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -147,3 +166,6 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
+
+# Seconds a checkout stock hold lasts before the sweep_reservations command releases it
+STOCK_RESERVATION_TTL = 15 * 60
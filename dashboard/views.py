@@ -1,10 +1,14 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from accounts.models import User
+from inventory.alerts import open_alerts
 from inventory.models import WarehouseItem
 from sales.models import CustomerOrder
+from sales.cart import cart_line_count
 from services.models import ServiceBooking
 
+DASHBOARD_ALERT_COUNT = 5
+
 @login_required
 def index(request):
     context = {
@@ -21,6 +25,9 @@ def index(request):
         context['employee_count'] = User.objects.filter(user_type='employee').count()
         context['total_users'] = User.objects.count()
         context['warehouse_count'] = WarehouseItem.objects.count()
+        # Read from the materialized alert table rather than recomputed over the inventory
+        context['stock_alert_count'] = open_alerts().count()
+        context['stock_alerts'] = open_alerts()[:DASHBOARD_ALERT_COUNT]
     
     # Add customer statistics
     if context['is_customer']:
@@ -28,12 +35,14 @@ def index(request):
         context['pending_orders'] = CustomerOrder.objects.filter(customer=request.user, status='pending').count()
         context['service_bookings'] = ServiceBooking.objects.filter(customer=request.user).count()
         context['active_services'] = ServiceBooking.objects.filter(customer=request.user, status__in=['pending', 'in_progress']).count()
-        context['cart_items'] = len(request.session.get('cart', {})) if 'cart' in request.session else 0
+        context['cart_items'] = cart_line_count(request.user)
     
     # Add dealer statistics
     if context['is_dealer']:
         context['dealer_orders'] = CustomerOrder.objects.filter(dealer=request.user).count()
         context['pending_approvals'] = CustomerOrder.objects.filter(dealer=request.user, status='pending').count()
         context['dealer_sales'] = request.user.sales.count()
+        context['stock_alert_count'] = open_alerts(request.user).count()
+        context['stock_alerts'] = open_alerts(request.user)[:DASHBOARD_ALERT_COUNT]
     
     return render(request, "dashboard/index.html", context)
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models import IntegerField, Value
+from django.utils import timezone
+from .models import DealerStock, StockAlert, WarehouseItem
+
+ALERT_BATCH_SIZE = 500
+
+
+def stock_breaches():
+    """
+    Every stock level below its reorder threshold as {(item_id, dealer_id): (available, threshold)}.
+
+    Warehouse items use dealer_id None. Both halves filter on the indexed
+    needs_reorder columns and are combined with UNION ALL, so this is one
+    query that never scans stock levels that are fine.
+    """
+    warehouse = WarehouseItem.objects.filter(needs_reorder=True).order_by().values_list(
+        'pk', Value(None, output_field=IntegerField()), 'quantity', 'reorder_threshold'
+    )
+    dealers = DealerStock.objects.filter(needs_reorder=True).order_by().values_list(
+        'item_id', 'dealer_id', 'available_quantity', 'reorder_threshold'
+    )
+    return {
+        (item_id, dealer_id): (available, threshold)
+        for item_id, dealer_id, available, threshold in warehouse.union(dealers, all=True)
+    }
+
+
+def scan_stock_alerts():
+    """
+    Bring the StockAlert table in line with current stock levels.
+
+    New breaches are inserted and alerts that no longer apply are deleted.
+    Alerts that still apply keep their detected_at and only have their
+    numbers refreshed. Returns {'open', 'opened', 'resolved'}.
+    """
+    breaches = stock_breaches()
+    now = timezone.now()
+
+    with transaction.atomic():
+        alerts = {
+            (alert.item_id, alert.dealer_id): alert
+            for alert in StockAlert.objects.select_for_update().only(
+                'pk', 'item_id', 'dealer_id', 'available_quantity', 'reorder_threshold'
+            )
+        }
+
+        resolved = [alert.pk for key, alert in alerts.items() if key not in breaches]
+        for start in range(0, len(resolved), ALERT_BATCH_SIZE):
+            StockAlert.objects.filter(pk__in=resolved[start:start + ALERT_BATCH_SIZE]).delete()
+
+        changed = []
+        for key, (available, threshold) in breaches.items():
+            alert = alerts.get(key)
+            if alert and (alert.available_quantity, alert.reorder_threshold) != (available, threshold):
+                alert.available_quantity = available
+                alert.reorder_threshold = threshold
+                alert.checked_at = now
+                changed.append(alert)
+        StockAlert.objects.bulk_update(changed, ['available_quantity', 'reorder_threshold', 'checked_at'], batch_size=ALERT_BATCH_SIZE)
+
+        opened = [
+            StockAlert(item_id=item_id, dealer_id=dealer_id, available_quantity=available, reorder_threshold=threshold)
+            for (item_id, dealer_id), (available, threshold) in breaches.items()
+            if (item_id, dealer_id) not in alerts
+        ]
+        StockAlert.objects.bulk_create(opened, batch_size=ALERT_BATCH_SIZE)
+
+    return {'open': len(breaches), 'opened': len(opened), 'resolved': len(resolved)}
+
+
+def open_alerts(dealer=None):
+    """Current alerts for a dealer's stock, or for the warehouse when ``dealer`` is None, lowest stock first"""
+    return StockAlert.objects.filter(dealer=dealer).select_related('item')
@@ -0,0 +1,77 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .models import WarehouseItem
+
+
+def get_catalog_cache_ttl():
+    """Seconds a cached catalog entry lives, bounding staleness from changes that bypass invalidation"""
+    return getattr(settings, 'CATALOG_CACHE_TTL', 60)
+
+
+def _all_categories():
+    return [value for value, _ in WarehouseItem.CATEGORY_CHOICES]
+
+
+def _version_key(category):
+    return f"catalog:version:{category}"
+
+
+def catalog_versions(categories=None):
+    """
+    Current version of each category's listings as {category: version}.
+
+    A missing counter is seeded with the current time rather than zero, so
+    an evicted counter can never roll back to a version that still has
+    entries cached under it.
+    """
+    keys = {_version_key(category): category for category in categories or _all_categories()}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return {category: versions.get(key) for key, category in keys.items()}
+
+
+def _bump(categories):
+    for category in categories:
+        key = _version_key(category)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_catalog(*categories):
+    """
+    Expire every cached listing that covers one of ``categories`` (all categories when none are given).
+
+    The bump runs once the current transaction commits. Otherwise a
+    concurrent request could re-cache the old rows under the new version.
+    """
+    categories = {category for category in categories if category} or set(_all_categories())
+    transaction.on_commit(lambda: _bump(categories))
+
+
+def cached_catalog(name, parts, build, categories=None, timeout=None):
+    """
+    Return the cached value of ``build()`` for ``name`` and ``parts``.
+
+    The cache key includes the versions of ``categories`` (all categories
+    when None), so bumping any of them makes the entry unreachable. Returns
+    ``build()`` directly on a miss and caches it for ``timeout`` seconds,
+    CATALOG_CACHE_TTL by default.
+    """
+    versions = catalog_versions(categories)
+    digest = hashlib.md5(repr((parts, sorted(versions.items()))).encode()).hexdigest()
+    key = f"catalog:{name}:{digest}"
+
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, get_catalog_cache_ttl() if timeout is None else timeout)
+    return value
@@ -0,0 +1,234 @@
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from common.upserts import upsert
+from .catalog_cache import invalidate_catalog
+from .models import StockMovement, WarehouseItem
+from .movements import record_movements
+
+REQUIRED_COLUMNS = ['sku', 'name', 'category', 'unit_price']
+OPTIONAL_COLUMNS = ['quantity', 'description', 'reorder_threshold']
+IMPORT_BATCH_SIZE = 1000
+# Largest values the WarehouseItem columns hold: DecimalField(max_digits=10, decimal_places=2) and IntegerField
+MAX_UNIT_PRICE = Decimal('99999999.99')
+MAX_COUNT = 2147483647
+
+_CATEGORIES = {}
+for _value, _label in WarehouseItem.CATEGORY_CHOICES:
+    _CATEGORIES[_value.lower()] = _value
+    _CATEGORIES[_label.lower()] = _value
+
+
+class CatalogImportError(Exception):
+    """Raised when a catalog file cannot be read at all"""
+
+
+def _normalise_header(header):
+    return [str(column or '').strip().lower().replace(' ', '_') for column in header]
+
+
+def _check_header(header):
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise CatalogImportError(f"Missing required column(s): {', '.join(missing)}")
+
+
+def _csv_rows(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    header = _normalise_header(next(reader, []))
+    _check_header(header)
+    yield header
+    for row in reader:
+        yield row
+
+
+def _xlsx_rows(file):
+    try:
+        import openpyxl
+    except ImportError:
+        raise CatalogImportError("XLSX import needs the openpyxl package (pip install openpyxl)")
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalise_header(next(rows, []))
+        _check_header(header)
+        yield header
+        for row in rows:
+            yield ['' if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+
+def read_catalog(file, filename):
+    """
+    Yield the header and then each data row of a CSV or XLSX catalog file.
+
+    Rows are read lazily, so the whole file never sits in memory.
+    """
+    if filename.lower().endswith('.xlsx'):
+        return _xlsx_rows(file)
+    if filename.lower().endswith('.csv'):
+        return _csv_rows(file)
+    raise CatalogImportError("Unsupported file type; upload a .csv or .xlsx file")
+
+
+def _parse_count(value, label, default, errors):
+    """A whole, non-negative number that fits an IntegerField, or ``default`` when blank; problems go to ``errors``"""
+    raw = str(value).strip()
+    if not raw:
+        return default
+    try:
+        number = Decimal(raw)
+        if not number.is_finite() or number != number.to_integral_value():
+            raise InvalidOperation
+        count = int(number)
+    except (InvalidOperation, ValueError, OverflowError):
+        errors.append(f"Invalid {label} '{raw}'")
+        return None
+    if count < 0:
+        errors.append(f"{label.capitalize()} cannot be negative")
+    elif count > MAX_COUNT:
+        errors.append(f"{label.capitalize()} cannot exceed {MAX_COUNT}")
+    return count
+
+
+def _parse_row(values, columns):
+    """Turn one raw row into WarehouseItem field values, or raise ValueError with every problem found"""
+    errors = []
+    sku = str(values.get('sku', '')).strip()
+    name = str(values.get('name', '')).strip()
+    if not sku:
+        errors.append("SKU is required")
+    elif len(sku) > 50:
+        errors.append("SKU is longer than 50 characters")
+    if not name:
+        errors.append("Name is required")
+    elif len(name) > 200:
+        errors.append("Name is longer than 200 characters")
+
+    category = _CATEGORIES.get(str(values.get('category', '')).strip().lower())
+    if category is None:
+        errors.append(f"Unknown category '{values.get('category', '')}'")
+
+    fields = {'sku': sku, 'name': name, 'category': category}
+    raw = str(values.get('unit_price', '')).strip()
+    try:
+        unit_price = Decimal(raw)
+        if not unit_price.is_finite():
+            raise InvalidOperation
+        fields['unit_price'] = unit_price.quantize(Decimal('0.01'))
+        if fields['unit_price'] < 0:
+            errors.append("Unit price cannot be negative")
+        elif fields['unit_price'] > MAX_UNIT_PRICE:
+            errors.append(f"Unit price cannot exceed {MAX_UNIT_PRICE}")
+    except (InvalidOperation, ValueError, OverflowError):
+        errors.append(f"Invalid unit price '{raw}'")
+
+    if 'quantity' in columns:
+        fields['quantity'] = _parse_count(values.get('quantity', ''), 'quantity', 0, errors)
+    if 'description' in columns:
+        fields['description'] = str(values.get('description', '')).strip()
+    if 'reorder_threshold' in columns:
+        fields['reorder_threshold'] = _parse_count(
+            values.get('reorder_threshold', ''), 'reorder threshold', WarehouseItem.DEFAULT_REORDER_THRESHOLD, errors
+        )
+
+    if errors:
+        raise ValueError('; '.join(errors))
+    return fields
+
+
+def _record_quantity_changes(batch, existing, updated_by):
+    """Ledger the stock each imported row adds or removes as adjustments"""
+    new_skus = [sku for sku in batch if sku not in existing and batch[sku].get('quantity')]
+    created = WarehouseItem.objects.filter(sku__in=new_skus).values_list('sku', 'pk') if new_skus else []
+    changes = [(pk, batch[sku]['quantity']) for sku, pk in created]
+    changes += [(pk, batch[sku]['quantity'] - quantity) for sku, (pk, quantity) in existing.items()]
+    record_movements([
+        StockMovement(item_id=pk, movement_type='adjustment', quantity_change=change, reference='import', created_by=updated_by)
+        for pk, change in changes
+    ])
+
+
+def _upsert(batch, update_fields, updated_by):
+    """Insert or update one batch of parsed rows keyed on SKU; returns how many SKUs already existed"""
+    # Locked so the ledgered quantity changes match what the upsert overwrites
+    current = WarehouseItem.objects.select_for_update().filter(sku__in=batch.keys()).values_list('sku', 'pk', 'quantity')
+    existing = {sku: (pk, quantity) for sku, pk, quantity in current}
+    upsert(
+        WarehouseItem,
+        [WarehouseItem(updated_by=updated_by, **fields) for fields in batch.values()],
+        unique_fields=['sku'],
+        update_fields=update_fields
+    )
+    if 'quantity' in update_fields:
+        _record_quantity_changes(batch, existing, updated_by)
+    return len(existing)
+
+
+def import_catalog(rows, updated_by=None, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Upsert WarehouseItems from catalog rows, as produced by read_catalog().
+
+    Rows are validated one by one and written in batches of ``batch_size``
+    with a single INSERT ... ON CONFLICT/ON DUPLICATE KEY statement each.
+    Invalid rows are skipped and reported. When a SKU repeats, the later row
+    wins. Quantity, description and reorder threshold are only overwritten
+    when the file has those columns; quantity changes are recorded in the stock movement
+    ledger. ``progress`` is called as progress(rows_read) after each
+    batch.
+
+    Returns {'created', 'updated', 'errors'}, where errors is a list of
+    {'row', 'sku', 'error'} using spreadsheet row numbers.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise CatalogImportError("The file is empty")
+    columns = [column for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if column in header]
+    update_fields = [column for column in columns if column != 'sku'] + ['updated_by', 'updated_at']
+
+    result = {'created': 0, 'updated': 0, 'errors': []}
+    batch = {}
+    rows_read = 0
+
+    def flush():
+        with transaction.atomic():
+            existing = _upsert(batch, update_fields, updated_by)
+        result['updated'] += existing
+        result['created'] += len(batch) - existing
+        batch.clear()
+        if progress:
+            progress(rows_read)
+
+    # Row 1 is the header
+    for row_number, row in enumerate(rows, start=2):
+        rows_read += 1
+        if not any(str(value).strip() for value in row):
+            continue
+        values = dict(zip(header, row))
+        try:
+            fields = _parse_row(values, columns)
+        except ValueError as e:
+            result['errors'].append({'row': row_number, 'sku': str(values.get('sku', '')).strip(), 'error': str(e)})
+            continue
+        batch.pop(fields['sku'], None)
+        batch[fields['sku']] = fields
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    # Bulk upserts bypass the WarehouseItem signals that expire the catalog cache
+    invalidate_catalog()
+    return result
+
+
+def write_error_report(errors, file):
+    """Write import errors as CSV to a text file object"""
+    writer = csv.writer(file)
+    writer.writerow(['row', 'sku', 'error'])
+    for error in errors:
+        writer.writerow([error['row'], error['sku'], error['error']])
@@ -0,0 +1,259 @@
+import math
+from collections import namedtuple
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from sales.models import DailyItemSales
+from .models import DealerStock, StockRequest
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it every pair goes through forecast_pair()
+    np = None
+
+HISTORY_DAYS = 56
+# Weight of the most recent day in the exponentially weighted sales velocity
+SMOOTHING = 0.1
+# Units sold before a pair's own weekday pattern is trusted over a flat week
+SEASONAL_PRIOR = 28
+LEAD_TIME_DAYS = 7
+COVER_DAYS = 14
+# About a 95% chance of not running out before the next delivery
+SAFETY_FACTOR = 1.65
+LOAD_BATCH_SIZE = 20000
+PAIR_CHUNK_SIZE = 50000
+# dealer_id * KEY_SPAN + item_id identifies a (dealer, item) pair in one int64
+KEY_SPAN = 1 << 32
+
+Suggestion = namedtuple('Suggestion', ['dealer_id', 'item_id', 'quantity', 'velocity', 'forecast', 'days_of_cover'])
+
+
+def _weights(days):
+    """EWMA weights for ``days`` daily values, oldest first, summing to one"""
+    weights = [SMOOTHING * (1 - SMOOTHING) ** (days - 1 - day) for day in range(days)]
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+
+def _weekday_counts(first_weekday, start, length):
+    """How often each weekday occurs in days start..start+length-1 counted from a day that is ``first_weekday``"""
+    counts = [0] * 7
+    for offset in range(start, start + length):
+        counts[(first_weekday + offset) % 7] += 1
+    return counts
+
+
+def _suggested_quantity(shortfall):
+    # Rounded first so both implementations agree on exact multiples
+    shortfall = round(shortfall, 6)
+    return math.ceil(shortfall) if shortfall >= 1 else 0
+
+
+def forecast_pair(series, available, pending, first_weekday):
+    """
+    Forecast one (dealer, item) pair from its daily sales, oldest day first.
+
+    Returns (velocity, forecast, days_of_cover, suggested_quantity). Velocity
+    is an exponentially weighted daily average. The forecast spreads it over
+    the lead time plus the cover period using the pair's weekday pattern,
+    shrunk towards a flat week while it has little history. The suggestion
+    tops the stock position (available plus pending requests) up to the
+    forecast plus safety stock.
+    """
+    days = len(series)
+    velocity = sum(quantity * weight for quantity, weight in zip(series, _weights(days)))
+    total = sum(series)
+    mean = total / days
+    trust = total / (total + SEASONAL_PRIOR)
+
+    seasonal = []
+    for weekday in range(7):
+        values = [series[day] for day in range(days) if (first_weekday + day) % 7 == weekday]
+        raw = (sum(values) / len(values)) / mean if mean > 0 else 1.0
+        seasonal.append(1 + trust * (raw - 1))
+
+    horizon = LEAD_TIME_DAYS + COVER_DAYS
+    counts = _weekday_counts(first_weekday, days, horizon)
+    forecast = velocity * sum(factor * count for factor, count in zip(seasonal, counts))
+    deviation = math.sqrt(sum((quantity - mean) ** 2 for quantity in series) / days)
+    safety = SAFETY_FACTOR * deviation * math.sqrt(horizon)
+
+    days_of_cover = available / velocity if velocity > 0 else math.inf
+    return velocity, forecast, days_of_cover, _suggested_quantity(forecast + safety - available - pending)
+
+
+def suggest_naive(history, positions, first_weekday):
+    """
+    Replenishment suggestions computed pair by pair with forecast_pair().
+
+    ``history`` maps (dealer_id, item_id) to its daily sales list and
+    ``positions`` maps pairs to (available, pending).
+    """
+    suggestions = []
+    for (dealer_id, item_id), series in history.items():
+        available, pending = positions.get((dealer_id, item_id), (0, 0))
+        velocity, forecast, days_of_cover, quantity = forecast_pair(series, available, pending, first_weekday)
+        if quantity:
+            suggestions.append(Suggestion(dealer_id, item_id, quantity, velocity, forecast, days_of_cover))
+    return suggestions
+
+
+def _forecast_chunk(demand, available, pending, first_weekday):
+    """forecast_pair() for every row of the (pairs, days) ``demand`` matrix at once"""
+    days = demand.shape[1]
+    velocity = demand @ np.array(_weights(days))
+    total = demand.sum(axis=1)
+    mean = total / days
+    trust = total / (total + SEASONAL_PRIOR)
+
+    weekday_of_day = (first_weekday + np.arange(days)) % 7
+    per_weekday = np.eye(7)[weekday_of_day]
+    weekday_mean = (demand @ per_weekday) / per_weekday.sum(axis=0)
+    raw = np.divide(weekday_mean, mean[:, None], out=np.ones_like(weekday_mean), where=mean[:, None] > 0)
+    seasonal = 1 + trust[:, None] * (raw - 1)
+
+    horizon = LEAD_TIME_DAYS + COVER_DAYS
+    forecast = velocity * (seasonal @ np.array(_weekday_counts(first_weekday, days, horizon)))
+    safety = SAFETY_FACTOR * demand.std(axis=1) * math.sqrt(horizon)
+
+    with np.errstate(divide='ignore'):
+        days_of_cover = np.where(velocity > 0, available / np.where(velocity > 0, velocity, 1), np.inf)
+    shortfall = np.round(forecast + safety - available - pending, 6)
+    quantity = np.where(shortfall >= 1, np.ceil(shortfall), 0).astype(np.int64)
+    return velocity, forecast, days_of_cover, quantity
+
+
+def suggest_vectorized(keys, day_index, quantities, position_keys, available, pending, first_weekday, days=HISTORY_DAYS):
+    """
+    Replenishment suggestions for all pairs with NumPy, ``PAIR_CHUNK_SIZE`` pairs at a time.
+
+    ``keys``/``day_index``/``quantities`` are parallel arrays of daily sales
+    (pair key, day offset, units). ``position_keys`` must be sorted, with
+    ``available`` and ``pending`` aligned to it. Gives the same result as
+    suggest_naive().
+    """
+    pairs, pair_index = np.unique(keys, return_inverse=True)
+    order = np.argsort(pair_index, kind='stable')
+    pair_index, day_index, quantities = pair_index[order], day_index[order], quantities[order]
+
+    # Stock position per pair; pairs without a DealerStock row hold nothing
+    found = np.searchsorted(position_keys, pairs)
+    found = np.minimum(found, max(len(position_keys) - 1, 0))
+    matched = (position_keys[found] == pairs) if len(position_keys) else np.zeros(len(pairs), dtype=bool)
+    pair_available = np.where(matched, available[found] if len(position_keys) else 0, 0).astype(np.float64)
+    pair_pending = np.where(matched, pending[found] if len(position_keys) else 0, 0).astype(np.float64)
+
+    suggestions = []
+    for start in range(0, len(pairs), PAIR_CHUNK_SIZE):
+        end = min(start + PAIR_CHUNK_SIZE, len(pairs))
+        low, high = np.searchsorted(pair_index, [start, end])
+        # One bincount scatters this chunk's sales into a dense (pairs, days) matrix
+        cells = (pair_index[low:high] - start) * days + day_index[low:high]
+        demand = np.bincount(cells, weights=quantities[low:high], minlength=(end - start) * days).reshape(end - start, days)
+
+        velocity, forecast, days_of_cover, quantity = _forecast_chunk(
+            demand, pair_available[start:end], pair_pending[start:end], first_weekday
+        )
+        for offset in np.flatnonzero(quantity):
+            key = int(pairs[start + offset])
+            suggestions.append(Suggestion(
+                key // KEY_SPAN, key % KEY_SPAN, int(quantity[offset]),
+                float(velocity[offset]), float(forecast[offset]), float(days_of_cover[offset])
+            ))
+    return suggestions
+
+
+def _history_rows(first_day, last_day, dealer_ids):
+    """(dealer_id, item_id, day offset, quantity) for every daily rollup row, in pk batches"""
+    rows = DailyItemSales.objects.filter(day__range=[first_day, last_day])
+    if dealer_ids is not None:
+        rows = rows.filter(dealer_id__in=dealer_ids)
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'dealer_id', 'item_id', 'day', 'quantity')[:LOAD_BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1][0]
+        yield [(dealer_id, item_id, (day - first_day).days, quantity) for _, dealer_id, item_id, day, quantity in batch]
+
+
+def _positions(dealer_ids):
+    """{(dealer_id, item_id): (available, pending)} for every stocked or requested pair"""
+    positions = {}
+    stocks = DealerStock.objects.all()
+    pending = StockRequest.objects.filter(status='pending')
+    if dealer_ids is not None:
+        stocks = stocks.filter(dealer_id__in=dealer_ids)
+        pending = pending.filter(dealer_id__in=dealer_ids)
+    for dealer_id, item_id, available in stocks.values_list('dealer_id', 'item_id', 'available_quantity'):
+        positions[(dealer_id, item_id)] = (available, 0)
+    for row in pending.values('dealer_id', 'item_id').annotate(requested=Sum('quantity_requested')).order_by():
+        available, _ = positions.get((row['dealer_id'], row['item_id']), (0, 0))
+        positions[(row['dealer_id'], row['item_id'])] = (available, row['requested'])
+    return positions
+
+
+def forecast_replenishment(as_of=None, dealer_ids=None, vectorized=None):
+    """
+    Suggested stock requests from the last HISTORY_DAYS days of dealer sales up to ``as_of`` (yesterday by default).
+
+    History comes from the DailyItemSales rollups. ``vectorized`` picks the
+    implementation; by default NumPy is used when it is installed.
+    """
+    last_day = as_of or timezone.localdate() - timedelta(days=1)
+    first_day = last_day - timedelta(days=HISTORY_DAYS - 1)
+    first_weekday = first_day.weekday()
+    positions = _positions(dealer_ids)
+    if vectorized is None:
+        vectorized = np is not None
+
+    if not vectorized:
+        history = {}
+        for batch in _history_rows(first_day, last_day, dealer_ids):
+            for dealer_id, item_id, day, quantity in batch:
+                history.setdefault((dealer_id, item_id), [0] * HISTORY_DAYS)[day] += quantity
+        return suggest_naive(history, positions, first_weekday)
+
+    batches = [np.array(batch, dtype=np.int64) for batch in _history_rows(first_day, last_day, dealer_ids)]
+    if not batches:
+        return []
+    rows = np.concatenate(batches)
+    position_keys = np.array([dealer_id * KEY_SPAN + item_id for dealer_id, item_id in positions], dtype=np.int64)
+    order = np.argsort(position_keys)
+    values = np.array(list(positions.values()), dtype=np.int64).reshape(-1, 2)
+    return suggest_vectorized(
+        rows[:, 0] * KEY_SPAN + rows[:, 1], rows[:, 2], rows[:, 3].astype(np.float64),
+        position_keys[order], values[order, 0], values[order, 1], first_weekday
+    )
+
+
+def draft_stock_requests(suggestions, dealer_ids=None):
+    """
+    Replace the suggested (draft) stock requests with ``suggestions``.
+
+    Drafts from earlier runs are deleted first, for ``dealer_ids`` only when
+    given. Dealers review drafts and submit them as pending requests.
+    Returns the number of drafts created.
+    """
+    drafts = StockRequest.objects.filter(status='draft')
+    if dealer_ids is not None:
+        drafts = drafts.filter(dealer_id__in=dealer_ids)
+    with transaction.atomic():
+        drafts.delete()
+        StockRequest.objects.bulk_create([
+            StockRequest(
+                dealer_id=suggestion.dealer_id,
+                item_id=suggestion.item_id,
+                quantity_requested=suggestion.quantity,
+                status='draft',
+                reason=(
+                    f"Suggested: selling {suggestion.velocity:.1f}/day, "
+                    f"{suggestion.days_of_cover:.0f} days of cover left"
+                    if suggestion.days_of_cover != math.inf else
+                    f"Suggested: selling {suggestion.velocity:.1f}/day, out of stock"
+                )
+            )
+            for suggestion in suggestions
+        ], batch_size=1000)
+    return len(suggestions)
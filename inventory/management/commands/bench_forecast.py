@@ -0,0 +1,69 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from inventory import forecasting
+from inventory.forecasting import HISTORY_DAYS, KEY_SPAN, suggest_naive, suggest_vectorized
+
+
+class Command(BaseCommand):
+    help = "Benchmark the vectorized replenishment forecast against the per-pair loop on synthetic sales history"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dealers', type=int, default=5000)
+        parser.add_argument('--items', type=int, default=20000)
+        parser.add_argument('--pairs', type=int, default=1000000, help='(dealer, item) pairs with sales in the history window')
+        parser.add_argument('--naive-pairs', type=int, default=20000, help='Pairs the per-pair loop is timed on; its full run is extrapolated')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        np = forecasting.np
+        if np is None:
+            raise CommandError("NumPy is required for this benchmark (pip install numpy)")
+
+        # Synthetic history shaped like the DailyItemSales rollups: only days with sales have rows
+        rng = np.random.default_rng(options['seed'])
+        dealer_ids = rng.integers(1, options['dealers'] + 1, options['pairs'])
+        item_ids = rng.integers(1, options['items'] + 1, options['pairs'])
+        pairs = np.unique(dealer_ids * KEY_SPAN + item_ids)
+        rates = rng.gamma(0.5, 1.0, len(pairs))
+        weekday_factor = np.array([0.8, 0.8, 0.9, 1.0, 1.2, 1.5, 0.8])
+        sales = rng.poisson(rates[:, None] * weekday_factor[np.arange(HISTORY_DAYS) % 7])
+        pair_index, day_index = np.nonzero(sales)
+        keys, quantities = pairs[pair_index], sales[pair_index, day_index].astype(np.float64)
+        available = rng.integers(0, 40, len(pairs))
+        pending = np.where(rng.random(len(pairs)) < 0.05, rng.integers(1, 20, len(pairs)), 0)
+        self.stdout.write(f"{len(pairs)} pairs, {len(keys)} daily sales rows over {HISTORY_DAYS} days")
+
+        started = perf_counter()
+        vectorized = suggest_vectorized(keys, day_index, quantities, pairs, available, pending, 0)
+        vectorized_seconds = perf_counter() - started
+
+        # The per-pair loop gets the same data as dicts, built outside the timing
+        sample = min(options['naive_pairs'], len(pairs))
+        history = {
+            (int(key) // KEY_SPAN, int(key) % KEY_SPAN): [int(quantity) for quantity in sales[index]]
+            for index, key in enumerate(pairs[:sample])
+        }
+        positions = {
+            (int(key) // KEY_SPAN, int(key) % KEY_SPAN): (int(available[index]), int(pending[index]))
+            for index, key in enumerate(pairs[:sample])
+        }
+        started = perf_counter()
+        naive = suggest_naive(history, positions, 0)
+        naive_seconds = perf_counter() - started
+        naive_full = naive_seconds * len(pairs) / sample if sample else 0
+
+        sample_keys = set(history)
+        expected = {(s.dealer_id, s.item_id): s.quantity for s in naive}
+        actual = {(s.dealer_id, s.item_id): s.quantity for s in vectorized if (s.dealer_id, s.item_id) in sample_keys}
+        mismatches = sum(1 for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key))
+
+        self.stdout.write(f"{'implementation':<16} {'pairs':>9} {'seconds':>9} {'suggestions':>12}")
+        self.stdout.write(f"{'vectorized':<16} {len(pairs):>9} {vectorized_seconds:>9.2f} {len(vectorized):>12}")
+        self.stdout.write(f"{'per-pair':<16} {sample:>9} {naive_seconds:>9.2f} {len(naive):>12}")
+        self.stdout.write(f"{'per-pair (est.)':<16} {len(pairs):>9} {naive_full:>9.2f}")
+        if vectorized_seconds:
+            self.stdout.write(f"Speed-up: {naive_full / vectorized_seconds:.0f}x")
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"{mismatches} of {sample} sampled pairs differ between implementations"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Both implementations agree on all {sample} sampled pairs"))
@@ -0,0 +1,41 @@
+from datetime import date
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from inventory import forecasting
+from inventory.forecasting import draft_stock_requests, forecast_replenishment
+
+
+class Command(BaseCommand):
+    help = "Forecast dealer demand from recent sales and draft suggested stock requests (run nightly, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help='Last day of sales history to use (YYYY-MM-DD, default yesterday)')
+        parser.add_argument('--dealer', type=int, action='append', dest='dealers', help='Only forecast this dealer id (repeatable)')
+        parser.add_argument('--naive', action='store_true', help='Use the per-pair implementation even when NumPy is installed')
+        parser.add_argument('--dry-run', action='store_true', help='Report suggestions without drafting stock requests')
+
+    def handle(self, *args, **options):
+        try:
+            as_of = date.fromisoformat(options['as_of']) if options['as_of'] else None
+        except ValueError:
+            raise CommandError(f"Invalid --as-of date: {options['as_of']}")
+        if forecasting.np is None and not options['naive']:
+            self.stdout.write(self.style.WARNING("NumPy is not installed; using the per-pair forecast"))
+
+        started = perf_counter()
+        suggestions = forecast_replenishment(
+            as_of=as_of, dealer_ids=options['dealers'], vectorized=False if options['naive'] else None
+        )
+        elapsed = perf_counter() - started
+
+        if options['dry_run']:
+            for suggestion in suggestions:
+                self.stdout.write(
+                    f"dealer {suggestion.dealer_id} item {suggestion.item_id}: {suggestion.quantity} "
+                    f"({suggestion.velocity:.2f}/day, {suggestion.days_of_cover:.1f} days of cover)"
+                )
+            self.stdout.write(self.style.SUCCESS(f"{len(suggestions)} suggestion(s) in {elapsed:.2f}s (dry run)"))
+            return
+
+        drafted = draft_stock_requests(suggestions, dealer_ids=options['dealers'])
+        self.stdout.write(self.style.SUCCESS(f"Drafted {drafted} suggested stock request(s); forecast took {elapsed:.2f}s"))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from inventory.catalog_import import (
+    IMPORT_BATCH_SIZE, CatalogImportError, import_catalog, read_catalog, write_error_report
+)
+
+
+class Command(BaseCommand):
+    help = "Create or update warehouse products from a CSV or XLSX catalog, keyed on SKU"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file (.csv or .xlsx) with sku, name, category and unit_price columns')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--user', help='Record this admin (username) as the updater')
+        parser.add_argument('--errors-file', help='Write rejected rows to this CSV file')
+
+    def handle(self, *args, **options):
+        updated_by = None
+        if options['user']:
+            updated_by = User.objects.filter(username=options['user'], user_type='admin').first()
+            if updated_by is None:
+                raise CommandError(f"Admin '{options['user']}' not found")
+
+        def progress(rows_read):
+            self.stdout.write(f"  {rows_read} row(s) processed")
+
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_catalog(
+                    read_catalog(file, options['path']),
+                    updated_by=updated_by,
+                    batch_size=options['batch_size'],
+                    progress=progress
+                )
+        except (OSError, CatalogImportError) as e:
+            raise CommandError(str(e))
+
+        if result['errors']:
+            if options['errors_file']:
+                with open(options['errors_file'], 'w', newline='', encoding='utf-8') as file:
+                    write_error_report(result['errors'], file)
+                self.stdout.write(self.style.WARNING(
+                    f"{len(result['errors'])} row(s) rejected; see {options['errors_file']}"
+                ))
+            else:
+                for error in result['errors'][:20]:
+                    self.stdout.write(self.style.WARNING(f"  Row {error['row']} ({error['sku']}): {error['error']}"))
+                self.stdout.write(self.style.WARNING(f"{len(result['errors'])} row(s) rejected"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} product(s), updated {result['updated']} product(s)"
+        ))
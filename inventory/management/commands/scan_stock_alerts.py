@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from inventory.alerts import scan_stock_alerts
+
+
+class Command(BaseCommand):
+    help = "Refresh the low-stock alert table from warehouse and dealer reorder thresholds (run periodically, e.g. from cron)"
+
+    def handle(self, *args, **options):
+        result = scan_stock_alerts()
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['open']} open alert(s): {result['opened']} new, {result['resolved']} resolved"
+        ))
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+FTS_TABLE = 'inventory_warehouseitem_fts'
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, sku, description,
+        content='inventory_warehouseitem', content_rowid='id',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON inventory_warehouseitem BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, description) VALUES (new.id, new.name, new.sku, new.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON inventory_warehouseitem BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, description) VALUES ('delete', old.id, old.name, old.sku, old.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF name, sku, description ON inventory_warehouseitem BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, description) VALUES ('delete', old.id, old.name, old.sku, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, description) VALUES (new.id, new.name, new.sku, new.description);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+MYSQL_FORWARD = [
+    "ALTER TABLE inventory_warehouseitem ADD FULLTEXT INDEX inventory_warehouseitem_search (name, sku, description)",
+]
+
+MYSQL_BACKWARD = [
+    "ALTER TABLE inventory_warehouseitem DROP INDEX inventory_warehouseitem_search",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_stockrequest_dealerstock'),
+    ]
+
+    operations = [
+        # The search index is kept in sync by the database itself (FTS5 triggers
+        # or InnoDB FULLTEXT), so bulk writes and update() calls are covered too
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'mysql': MYSQL_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'mysql': MYSQL_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_warehouseitem_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='warehouseitem',
+            index=models.Index(fields=['created_at'], name='inventory_w_created_377bb4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='warehouseitem',
+            index=models.Index(fields=['name'], name='inventory_w_name_2245b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='warehouseitem',
+            index=models.Index(fields=['quantity'], name='inventory_w_quantit_9f3df2_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:59
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+FTS_TABLE = 'inventory_warehouseitem_fts'
+
+# Adding a stored generated column makes SQLite rebuild the table, which drops
+# the full-text search triggers from 0003, so they are created again afterwards
+SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON inventory_warehouseitem BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, description) VALUES (new.id, new.name, new.sku, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON inventory_warehouseitem BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, description) VALUES ('delete', old.id, old.name, old.sku, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF name, sku, description ON inventory_warehouseitem BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, description) VALUES ('delete', old.id, old.name, old.sku, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, description) VALUES (new.id, new.name, new.sku, new.description);
+    END""",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_stockmovement'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after the table has been rebuilt again
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='warehouseitem',
+            name='reorder_threshold',
+            field=models.IntegerField(default=10),
+        ),
+        migrations.AddField(
+            model_name='warehouseitem',
+            name='needs_reorder',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('quantity__lt', models.F('reorder_threshold'))), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='warehouseitem',
+            index=models.Index(fields=['needs_reorder', 'quantity'], name='inventory_w_needs_r_15b1f5_idx'),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='dealerstock',
+            name='reorder_threshold',
+            field=models.IntegerField(default=5),
+        ),
+        migrations.AddField(
+            model_name='dealerstock',
+            name='needs_reorder',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('quantity__lt', django.db.models.expressions.CombinedExpression(models.F('allocated_quantity'), '+', models.F('reorder_threshold')))), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='dealerstock',
+            index=models.Index(fields=['needs_reorder', 'dealer'], name='inventory_d_needs_r_a8a940_idx'),
+        ),
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('available_quantity', models.IntegerField()),
+                ('reorder_threshold', models.IntegerField()),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('checked_at', models.DateTimeField(auto_now=True)),
+                ('dealer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='inventory.warehouseitem')),
+            ],
+            options={
+                'ordering': ['available_quantity'],
+                'indexes': [models.Index(fields=['dealer', 'available_quantity'], name='inventory_s_dealer__28927b_idx')],
+            },
+        ),
+    ]
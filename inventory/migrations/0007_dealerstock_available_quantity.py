@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_reorder_thresholds_stockalert'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dealerstock',
+            name='available_quantity',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '-', models.F('allocated_quantity')), output_field=models.IntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='dealerstock',
+            index=models.Index(fields=['dealer', 'available_quantity'], name='inventory_d_dealer__088e6f_idx'),
+        ),
+    ]
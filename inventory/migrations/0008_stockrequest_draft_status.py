@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_dealerstock_available_quantity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stockrequest',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Suggested'), ('pending', 'Pending'), ('approved', 'Approved'), ('partially_approved', 'Partially Approved'), ('rejected', 'Rejected')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_pending_requests(apps, schema_editor):
+    # The request view used to update a dealer's pending request in place but
+    # could race into duplicates; keep the newest one per dealer and item
+    StockRequest = apps.get_model('inventory', 'StockRequest')
+    duplicated = StockRequest.objects.filter(status='pending').values('dealer', 'item').annotate(
+        count=Count('pk'), newest=Max('pk')
+    ).filter(count__gt=1).order_by()
+    for row in duplicated:
+        StockRequest.objects.filter(
+            dealer_id=row['dealer'], item_id=row['item'], status='pending', pk__lt=row['newest']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_stockrequest_draft_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockrequest',
+            name='pending_item',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(status='pending', then=models.F('item')), default=None), output_field=models.BigIntegerField(null=True)),
+        ),
+        migrations.RunPython(drop_duplicate_pending_requests, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='stockrequest',
+            constraint=models.UniqueConstraint(fields=('dealer', 'pending_item'), name='unique_pending_stock_request'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_stockrequest_unique_pending'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dealerstock',
+            index=models.Index(fields=['dealer', 'quantity', 'allocated_quantity', 'reorder_threshold', 'selling_price'], name='inventory_d_dealer__10c8f8_idx'),
+        ),
+    ]
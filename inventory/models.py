@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Case, F, Q, When
 from accounts.models import User
 
 class WarehouseItem(models.Model):
@@ -7,11 +8,19 @@ class WarehouseItem(models.Model):
         ('parts', 'Parts'),
         ('accessories', 'Accessories'),
     )
+    DEFAULT_REORDER_THRESHOLD = 10
     
     name = models.CharField(max_length=200)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     sku = models.CharField(max_length=50, unique=True)
     quantity = models.IntegerField(default=0)
+    reorder_threshold = models.IntegerField(default=DEFAULT_REORDER_THRESHOLD)  # Low on stock below this quantity
+    # Kept up to date by the database, so low-stock lookups are an index seek
+    needs_reorder = models.GeneratedField(
+        expression=Q(quantity__lt=F('reorder_threshold')),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -20,15 +29,34 @@ class WarehouseItem(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['name']),
+            models.Index(fields=['quantity']),
+            models.Index(fields=['needs_reorder', 'quantity']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.sku}) - Qty: {self.quantity}"
 
 class DealerStock(models.Model):
+    DEFAULT_REORDER_THRESHOLD = 5
+    
     dealer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='dealer_stocks')
     item = models.ForeignKey(WarehouseItem, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=0)
     allocated_quantity = models.IntegerField(default=0)  # Quantity allocated for sales
+    available_quantity = models.GeneratedField(
+        expression=F('quantity') - F('allocated_quantity'),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
+    reorder_threshold = models.IntegerField(default=DEFAULT_REORDER_THRESHOLD)  # Low on stock when less than this is available
+    needs_reorder = models.GeneratedField(
+        expression=Q(quantity__lt=F('allocated_quantity') + F('reorder_threshold')),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
     selling_price = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -36,16 +64,20 @@ class DealerStock(models.Model):
     class Meta:
         unique_together = ['dealer', 'item']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['needs_reorder', 'dealer']),
+            models.Index(fields=['dealer', 'available_quantity']),
+            # Covers the per-dealer totals of the inventory report, so grouping
+            # millions of rows never has to visit the table
+            models.Index(fields=['dealer', 'quantity', 'allocated_quantity', 'reorder_threshold', 'selling_price']),
+        ]
     
     def __str__(self):
         return f"{self.dealer.username} - {self.item.name}: {self.quantity}"
-    
-    @property
-    def available_quantity(self):
-        return self.quantity - self.allocated_quantity
 
 class StockRequest(models.Model):
     STATUS_CHOICES = (
+        ('draft', 'Suggested'),
         ('pending', 'Pending'),
         ('approved', 'Approved'),
         ('partially_approved', 'Partially Approved'),
@@ -61,9 +93,67 @@ class StockRequest(models.Model):
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_requests')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # The item while the request is pending, NULL otherwise. Unique per dealer,
+    # so a dealer has at most one pending request per item; unlike a
+    # conditional unique constraint this is also enforced on MySQL.
+    pending_item = models.GeneratedField(
+        expression=Case(When(status='pending', then=F('item')), default=None),
+        output_field=models.BigIntegerField(null=True),
+        db_persist=True,
+    )
     
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['dealer', 'pending_item'], name='unique_pending_stock_request'),
+        ]
     
     def __str__(self):
         return f"{self.dealer.username} - {self.item.name}: {self.quantity_requested} ({self.status})"
+
+class StockMovement(models.Model):
+    MOVEMENT_TYPE_CHOICES = (
+        ('transfer', 'Transfer to Dealer'),
+        ('order', 'Customer Order'),
+        ('sale', 'Dealer Sale'),
+        ('adjustment', 'Adjustment'),
+    )
+    
+    # Append-only: every change to warehouse or dealer stock adds a row, nothing is updated
+    item = models.ForeignKey(WarehouseItem, on_delete=models.CASCADE, related_name='movements')
+    dealer = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='stock_movements')  # None for warehouse stock
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPE_CHOICES)
+    quantity_change = models.IntegerField()  # Negative when stock leaves
+    reference = models.CharField(max_length=50, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='recorded_movements')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['item', 'created_at']),
+            models.Index(fields=['dealer', 'created_at']),
+        ]
+    
+    def __str__(self):
+        location = self.dealer.username if self.dealer_id else 'warehouse'
+        return f"{self.item.name} @ {location}: {self.quantity_change:+d} ({self.movement_type})"
+
+class StockAlert(models.Model):
+    # Rebuilt by the scan_stock_alerts command: one row per stock level currently below its reorder threshold
+    item = models.ForeignKey(WarehouseItem, on_delete=models.CASCADE, related_name='alerts')
+    dealer = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='stock_alerts')  # None for warehouse stock
+    available_quantity = models.IntegerField()
+    reorder_threshold = models.IntegerField()
+    detected_at = models.DateTimeField(auto_now_add=True)
+    checked_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['available_quantity']
+        indexes = [
+            models.Index(fields=['dealer', 'available_quantity']),
+        ]
+    
+    def __str__(self):
+        location = self.dealer.username if self.dealer_id else 'warehouse'
+        return f"{self.item.name} @ {location}: {self.available_quantity} < {self.reorder_threshold}"
@@ -0,0 +1,67 @@
+from django.db.models import Case, CharField, Count, DateField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Trunc
+from sales.dates import period_bounds
+from .models import StockMovement
+
+MOVEMENT_PERIODS = ('day', 'week', 'month')
+
+
+def record_movements(movements):
+    """Append StockMovement rows with one INSERT, skipping any that change nothing"""
+    movements = [movement for movement in movements if movement.quantity_change]
+    if movements:
+        StockMovement.objects.bulk_create(movements, batch_size=500)
+    return movements
+
+
+def _units(condition):
+    return Sum(Case(When(condition, then='quantity_change'), default=Value(0), output_field=IntegerField()))
+
+
+def movement_report(start_date, end_date, period='day', dealer=None):
+    """
+    Summarise stock movements between two dates per period, type and location.
+
+    One grouped query over the ledger does all the work. ``dealer`` limits
+    the report to that dealer's stock. A transfer shows up twice: as units
+    leaving the warehouse and as units entering the dealer's stock.
+    Negative adjustments, stock that disappeared outside any order, sale or
+    transfer, are totalled separately as ``shrinkage``.
+    """
+    if period not in MOVEMENT_PERIODS:
+        raise ValueError(f"Unknown period '{period}'")
+    start, end = period_bounds(start_date, end_date)
+
+    movements = StockMovement.objects.filter(created_at__gte=start, created_at__lt=end)
+    if dealer is not None:
+        movements = movements.filter(dealer=dealer)
+
+    rows = movements.annotate(
+        period_start=Trunc('created_at', period, output_field=DateField()),
+        location=Case(When(dealer__isnull=True, then=Value('warehouse')), default=Value('dealer'), output_field=CharField()),
+    ).values('period_start', 'movement_type', 'location').annotate(
+        movements=Count('id'),
+        units_in=_units(Q(quantity_change__gt=0)),
+        units_out=_units(Q(quantity_change__lt=0)),
+        net=Sum('quantity_change'),
+    ).order_by('period_start', 'location', 'movement_type')
+
+    report = {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'period': period,
+        'periods': [],
+        'totals': {},
+        'shrinkage': 0,
+    }
+    for row in rows:
+        row['period_start'] = row['period_start'].isoformat()
+        row['units_out'] = -row['units_out']
+        report['periods'].append(row)
+
+        totals = report['totals'].setdefault(row['movement_type'], {'movements': 0, 'units_in': 0, 'units_out': 0, 'net': 0})
+        for key in totals:
+            totals[key] += row[key]
+        if row['movement_type'] == 'adjustment':
+            report['shrinkage'] += row['units_out']
+    return report
@@ -0,0 +1,139 @@
+import re
+from django.db import connection
+from django.db.models import Case, Count, FloatField, Q, Value, When
+from django.db.models.functions import Length
+from django.db.models.expressions import RawSQL
+from .models import WarehouseItem
+
+# Maintained by the 0003_warehouseitem_search_index migration
+FTS_TABLE = 'inventory_warehouseitem_fts'
+FULLTEXT_COLUMNS = 'name, sku, description'
+# InnoDB does not index tokens shorter than innodb_ft_min_token_size (3 by default)
+MYSQL_MIN_TOKEN = 3
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_CANDIDATES = 500
+
+
+def _tokens(term):
+    return re.findall(r'\w+', term or '')
+
+
+def _sqlite_query(tokens, prefix):
+    # Every token must match; the last one may be incomplete while the user types
+    parts = [f'"{token}"' for token in tokens]
+    if prefix:
+        parts[-1] += '*'
+    return ' '.join(parts)
+
+
+def _mysql_query(tokens, prefix):
+    parts = [f'+{token}' for token in tokens[:-1] if len(token) >= MYSQL_MIN_TOKEN]
+    last = tokens[-1]
+    if prefix:
+        parts.append(f'+{last}*')
+    elif len(last) >= MYSQL_MIN_TOKEN:
+        parts.append(f'+{last}')
+    return ' '.join(parts)
+
+
+def search_products(queryset, term, prefix=True):
+    """
+    Restrict a WarehouseItem queryset to products matching ``term``, best match first.
+
+    Uses the FTS5 table on SQLite and the FULLTEXT index on MySQL. Other
+    backends fall back to a case-insensitive scan. Matches are annotated with
+    ``search_rank``, where higher is better.
+    """
+    tokens = _tokens(term)
+    if not tokens:
+        return queryset
+
+    table = WarehouseItem._meta.db_table
+    if connection.vendor == 'sqlite':
+        # Joined rather than correlated, so the match runs once for the whole query
+        queryset = queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[_sqlite_query(tokens, prefix)],
+            # bm25 ranks are negative, more negative is better
+            select={'search_rank': f"-{FTS_TABLE}.rank"},
+        )
+    elif connection.vendor == 'mysql':
+        query = _mysql_query(tokens, prefix)
+        if not query:
+            return queryset.none()
+        queryset = queryset.annotate(search_rank=RawSQL(
+            f"MATCH ({FULLTEXT_COLUMNS}) AGAINST (%s IN BOOLEAN MODE)", [query],
+            output_field=FloatField()
+        )).filter(search_rank__gt=0)
+    else:
+        condition = Q()
+        for token in tokens:
+            condition &= Q(name__icontains=token) | Q(sku__icontains=token) | Q(description__icontains=token)
+        return queryset.filter(condition).annotate(search_rank=Value(0))
+
+    return queryset.order_by('-search_rank', 'pk')
+
+
+def category_facets(queryset):
+    """Per-category product counts for a queryset, one entry per category choice"""
+    counts = dict(queryset.order_by().values_list('category').annotate(count=Count('id')))
+    return [
+        {'value': value, 'label': label, 'count': counts.get(value, 0)}
+        for value, label in WarehouseItem.CATEGORY_CHOICES
+    ]
+
+
+def catalog_search(queryset, term=None, category=None):
+    """
+    Search a product queryset and facet it in one go.
+
+    Returns (results, facets). Facets count the matches in every category
+    and ignore the ``category`` filter, so the other options stay visible.
+    """
+    matches = search_products(queryset, term) if term else queryset
+    facets = category_facets(matches)
+    if category:
+        matches = matches.filter(category=category)
+    return matches, facets
+
+
+def _autocomplete_candidates(tokens):
+    """
+    Ids of the newest products matching the typed prefix, capped at AUTOCOMPLETE_CANDIDATES.
+
+    Ranking every match of a short, common prefix costs time proportional
+    to the catalog. Suggestions therefore only rank this bounded set, which
+    the index returns in id order without scoring.
+    """
+    table = WarehouseItem._meta.db_table
+    if connection.vendor == 'sqlite':
+        return RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rowid DESC LIMIT {AUTOCOMPLETE_CANDIDATES}",
+            [_sqlite_query(tokens, prefix=True)]
+        )
+    if connection.vendor == 'mysql':
+        # MySQL rejects LIMIT directly inside an IN subquery, hence the derived table
+        return RawSQL(
+            f"SELECT id FROM (SELECT id FROM {table} WHERE MATCH ({FULLTEXT_COLUMNS}) AGAINST (%s IN BOOLEAN MODE)"
+            f" ORDER BY id DESC LIMIT {AUTOCOMPLETE_CANDIDATES}) AS candidates",
+            [_mysql_query(tokens, prefix=True)]
+        )
+    return None
+
+
+def autocomplete(queryset, term, limit=AUTOCOMPLETE_LIMIT):
+    """Prefix suggestions for ``term`` as small dicts, names starting with the term first"""
+    tokens = _tokens(term)
+    if not tokens:
+        return []
+
+    candidates = _autocomplete_candidates(tokens)
+    if candidates is not None:
+        queryset = queryset.filter(pk__in=candidates)
+    else:
+        queryset = search_products(queryset, term)
+
+    return list(queryset.annotate(
+        name_prefix=Case(When(name__istartswith=term.strip(), then=Value(0)), default=Value(1))
+    ).order_by('name_prefix', Length('name'), 'name').values('id', 'name', 'sku', 'category')[:limit])
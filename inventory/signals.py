@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .catalog_cache import invalidate_catalog
+from .models import WarehouseItem
+
+
+@receiver(pre_save, sender=WarehouseItem)
+def remember_previous_category(sender, instance, raw=False, **kwargs):
+    # A product moving between categories changes both listings
+    if instance.pk and not raw:
+        instance._previous_category = sender.objects.filter(pk=instance.pk).values_list('category', flat=True).first()
+
+
+@receiver(post_save, sender=WarehouseItem)
+def invalidate_catalog_on_save(sender, instance, **kwargs):
+    invalidate_catalog(instance.category, getattr(instance, '_previous_category', None))
+
+
+@receiver(post_delete, sender=WarehouseItem)
+def invalidate_catalog_on_delete(sender, instance, **kwargs):
+    invalidate_catalog(instance.category)
@@ -0,0 +1,170 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, CharField, F, IntegerField, Value, When
+from django.utils import timezone
+from .catalog_cache import invalidate_catalog
+from .models import DealerStock, StockMovement, StockRequest, WarehouseItem
+from .movements import record_movements
+from sales.reservations import with_available_to_sell
+
+# New dealer stock is priced at the warehouse price plus this markup
+DEALER_MARKUP = Decimal('1.2')
+
+
+class StockApprovalError(Exception):
+    """Raised when a stock request cannot be approved"""
+
+
+def _per_pk(values, output_field=None):
+    """CASE expression mapping each pk to its value in {pk: value}"""
+    return Case(
+        *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+        default=Value(0),
+        output_field=output_field or IntegerField()
+    )
+
+
+def approve_stock_requests(request_ids, approved_by, quantities=None):
+    """
+    Approve pending stock requests in bulk and return (approved_requests, failures).
+
+    ``quantities`` optionally maps a request id to a smaller quantity to ship,
+    which makes that approval partial. The requests and the warehouse items
+    they draw on are locked up front. Requests are then allocated oldest
+    first against what is available to sell (quantity minus active checkout
+    holds and order commitments). A request that does not fit is
+    skipped and reported in ``failures`` ({request_id: reason}). The
+    warehouse deduction, the dealer stock updates and inserts, the status
+    change and the ledger entries are each a single statement, so the query
+    count does not grow with the number of requests.
+    """
+    request_ids = set(request_ids)
+    quantities = quantities or {}
+    failures = {}
+
+    with transaction.atomic():
+        stock_requests = list(StockRequest.objects.select_for_update().filter(
+            pk__in=request_ids,
+            status='pending'
+        ).order_by('created_at', 'pk'))
+        for request_id in request_ids - {stock_request.pk for stock_request in stock_requests}:
+            failures[request_id] = "Request not found or not pending"
+
+        # Units held by checkouts or committed to placed orders are not
+        # available, exactly as at checkout; the item locks keep the holds stable
+        locked = with_available_to_sell(WarehouseItem.objects.select_for_update().filter(
+            pk__in={stock_request.item_id for stock_request in stock_requests}
+        )).order_by('pk').values_list('pk', 'available_to_sell', 'category', 'unit_price')
+        items = {pk: {'available': available, 'category': category, 'unit_price': unit_price} for pk, available, category, unit_price in locked}
+
+        approved = []
+        deductions = {}
+        for stock_request in stock_requests:
+            quantity = quantities.get(stock_request.pk, stock_request.quantity_requested)
+            if not 0 < quantity <= stock_request.quantity_requested:
+                failures[stock_request.pk] = "Approved quantity must be between 1 and the requested quantity"
+                continue
+            item = items[stock_request.item_id]
+            if item['available'] < quantity:
+                failures[stock_request.pk] = "Insufficient warehouse stock"
+                continue
+            item['available'] -= quantity
+            deductions[stock_request.item_id] = deductions.get(stock_request.item_id, 0) + quantity
+            stock_request.quantity_approved = quantity
+            stock_request.status = 'partially_approved' if quantity < stock_request.quantity_requested else 'approved'
+            approved.append(stock_request)
+
+        if not approved:
+            return [], failures
+
+        now = timezone.now()
+        WarehouseItem.objects.filter(pk__in=deductions.keys()).update(
+            quantity=F('quantity') - _per_pk(deductions),
+            updated_at=now
+        )
+        # update() bypasses the WarehouseItem signals that expire the catalog cache
+        invalidate_catalog(*{items[item_id]['category'] for item_id in deductions})
+
+        # The same dealer may have several requests for one item
+        shipments = {}
+        for stock_request in approved:
+            key = (stock_request.dealer_id, stock_request.item_id)
+            shipments[key] = shipments.get(key, 0) + stock_request.quantity_approved
+
+        existing = {
+            (stock.dealer_id, stock.item_id): stock.pk
+            for stock in DealerStock.objects.select_for_update().filter(
+                dealer_id__in={dealer_id for dealer_id, _ in shipments},
+                item_id__in={item_id for _, item_id in shipments}
+            ).only('pk', 'dealer_id', 'item_id')
+        }
+        additions = {existing[key]: quantity for key, quantity in shipments.items() if key in existing}
+        if additions:
+            DealerStock.objects.filter(pk__in=additions.keys()).update(
+                quantity=F('quantity') + _per_pk(additions),
+                updated_at=now
+            )
+        DealerStock.objects.bulk_create([
+            DealerStock(
+                dealer_id=dealer_id,
+                item_id=item_id,
+                quantity=quantity,
+                selling_price=(items[item_id]['unit_price'] * DEALER_MARKUP).quantize(Decimal('0.01'))
+            )
+            for (dealer_id, item_id), quantity in shipments.items()
+            if (dealer_id, item_id) not in existing
+        ])
+
+        approved_pks = [stock_request.pk for stock_request in approved]
+        StockRequest.objects.filter(pk__in=approved_pks).update(
+            quantity_approved=_per_pk({stock_request.pk: stock_request.quantity_approved for stock_request in approved}),
+            status=_per_pk({stock_request.pk: stock_request.status for stock_request in approved}, CharField()),
+            approved_by=approved_by,
+            updated_at=now
+        )
+
+        record_movements([
+            StockMovement(
+                item_id=stock_request.item_id,
+                dealer_id=dealer_id,
+                movement_type='transfer',
+                quantity_change=quantity,
+                reference=f"SR-{stock_request.pk}",
+                created_by=approved_by
+            )
+            for stock_request in approved
+            for dealer_id, quantity in (
+                (None, -stock_request.quantity_approved),
+                (stock_request.dealer_id, stock_request.quantity_approved),
+            )
+        ])
+
+    for stock_request in approved:
+        stock_request.approved_by = approved_by
+        stock_request.updated_at = now
+    return approved, failures
+
+
+def approve_stock_request(stock_request, approved_by, quantity=None):
+    """Approve a single request, raising StockApprovalError if it cannot be fulfilled"""
+    approved, failures = approve_stock_requests(
+        [stock_request.pk],
+        approved_by,
+        quantities={stock_request.pk: quantity} if quantity is not None else None
+    )
+    if not approved:
+        raise StockApprovalError(failures.get(stock_request.pk, "Request could not be approved"))
+    return approved[0]
+
+
+def reject_stock_request(stock_request, rejected_by):
+    """Reject a pending request; the status check and the change are one UPDATE"""
+    rejected = StockRequest.objects.filter(pk=stock_request.pk, status='pending').update(
+        status='rejected',
+        approved_by=rejected_by,
+        updated_at=timezone.now()
+    )
+    if not rejected:
+        raise StockApprovalError("Request not found or not pending")
+    stock_request.status = 'rejected'
+    stock_request.approved_by = rejected_by
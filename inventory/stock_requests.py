@@ -0,0 +1,59 @@
+from django.db import transaction
+from common.upserts import upsert
+from .models import StockRequest, WarehouseItem
+
+SUBMIT_BATCH_SIZE = 1000
+
+
+def submit_stock_requests(dealer, lines, reason=''):
+    """
+    Create or update a dealer's pending stock requests for many items at once.
+
+    ``lines`` is an iterable of (item_id, quantity); a later line for the same
+    item replaces an earlier one, as resubmitting a single item always has.
+    Existing pending requests are updated in place through the
+    unique_pending_stock_request constraint, and the forecast's drafts for the
+    submitted items are dropped. The query count does not grow with the
+    number of lines. Returns {'created', 'updated', 'failed'}: item id lists
+    and {item_id: reason}.
+    """
+    quantities = {}
+    failures = {}
+    for item_id, quantity in lines:
+        if quantity <= 0:
+            failures[item_id] = "Quantity must be positive"
+            quantities.pop(item_id, None)
+        else:
+            quantities[item_id] = quantity
+            failures.pop(item_id, None)
+
+    known = set(WarehouseItem.objects.filter(pk__in=quantities).values_list('pk', flat=True))
+    for item_id in quantities.keys() - known:
+        failures[item_id] = "Item not found"
+        del quantities[item_id]
+    if not quantities:
+        return {'created': [], 'updated': [], 'failed': failures}
+
+    with transaction.atomic():
+        pending = set(StockRequest.objects.filter(
+            dealer=dealer, item_id__in=quantities, status='pending'
+        ).values_list('item_id', flat=True))
+        # Keyed on the unique_pending_stock_request constraint's columns
+        upsert(
+            StockRequest,
+            [
+                StockRequest(dealer=dealer, item_id=item_id, quantity_requested=quantity, reason=reason)
+                for item_id, quantity in quantities.items()
+            ],
+            unique_fields=['dealer', 'pending_item'],
+            update_fields=['quantity_requested', 'reason', 'updated_at'],
+            batch_size=SUBMIT_BATCH_SIZE,
+        )
+        # A real request supersedes the forecast's suggestion for the item
+        StockRequest.objects.filter(dealer=dealer, item_id__in=quantities, status='draft').delete()
+
+    return {
+        'created': [item_id for item_id in quantities if item_id not in pending],
+        'updated': [item_id for item_id in quantities if item_id in pending],
+        'failed': failures,
+    }
@@ -6,13 +6,22 @@ app_name = "inventory"
 urlpatterns = [
     # Dealer Stock Management
     path("dealer/stock/", views.dealer_stock_view, name="dealer_stock"),
+    path("dealer/stock/<int:stock_id>/threshold/", views.dealer_stock_threshold_view, name="dealer_stock_threshold"),
     path("dealer/stock/request/", views.stock_request_view, name="stock_request"),
+    path("dealer/stock/request/batch/", views.stock_request_batch_view, name="stock_request_batch"),
     
     # Admin Stock Management
     path("admin/stock/", views.admin_stock_view, name="admin_stock"),
     path("admin/products/", views.product_management_view, name="product_management"),
+    path("admin/products/api/", views.product_grid_api, name="product_grid_api"),
     path("admin/products/create/", views.product_create_view, name="product_create"),
+    path("admin/products/import/", views.product_import_view, name="product_import"),
     path("admin/products/<int:product_id>/edit/", views.product_edit_view, name="product_edit"),
+    
+    # Catalog Search
+    path("products/search/", views.product_search_api, name="product_search"),
+    path("products/autocomplete/", views.product_autocomplete_api, name="product_autocomplete"),
     path("admin/requests/", views.stock_requests_view, name="stock_requests"),
     path("admin/requests/<int:request_id>/approve/", views.approve_stock_request_view, name="approve_request"),
+    path("admin/requests/bulk-approve/", views.bulk_approve_stock_requests_view, name="bulk_approve_requests"),
 ]
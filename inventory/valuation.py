@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db.models import Avg, Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum
+from .catalog_cache import cached_catalog
+from .models import WarehouseItem
+
+
+def get_valuation_cache_ttl():
+    return getattr(settings, 'INVENTORY_VALUATION_CACHE_TTL', 30)
+
+
+def stock_value():
+    """quantity * unit_price as a database expression"""
+    return ExpressionWrapper(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def _valuation():
+    aggregates = {
+        'total_items': Count('id'),
+        'total_quantity': Sum('quantity'),
+        'total_value': Sum(stock_value()),
+        'avg_item_value': Avg(stock_value()),
+        'avg_unit_price': Avg('unit_price'),
+        'highest_unit_price': Max('unit_price'),
+        'highest_item_value': Max(stock_value()),
+        'low_stock_count': Count('id', filter=Q(needs_reorder=True)),
+        'out_of_stock_count': Count('id', filter=Q(quantity__lte=0)),
+    }
+    for value, _ in WarehouseItem.CATEGORY_CHOICES:
+        in_category = Q(category=value)
+        aggregates[f'{value}__items'] = Count('id', filter=in_category)
+        aggregates[f'{value}__quantity'] = Sum('quantity', filter=in_category)
+        aggregates[f'{value}__value'] = Sum(stock_value(), filter=in_category)
+
+    row = WarehouseItem.objects.aggregate(**aggregates)
+
+    categories = [
+        {
+            'category': value,
+            'label': label,
+            'items': row.pop(f'{value}__items'),
+            'quantity': row.pop(f'{value}__quantity') or 0,
+            'value': row.pop(f'{value}__value') or 0,
+        }
+        for value, label in WarehouseItem.CATEGORY_CHOICES
+    ]
+    valuation = {key: value or 0 for key, value in row.items()}
+    valuation['categories'] = categories
+    most_stocked = max(categories, key=lambda category: category['items'], default=None)
+    valuation['most_stocked_category'] = most_stocked['category'] if most_stocked and most_stocked['items'] else None
+    return valuation
+
+
+def inventory_valuation(use_cache=True):
+    """
+    Warehouse totals, averages, maxima, low-stock counts and per-category breakdown.
+
+    Items count as low on stock when they are below their own reorder
+    threshold. Everything comes from a single conditional-aggregate query.
+    Results are cached for INVENTORY_VALUATION_CACHE_TTL seconds and dropped
+    as soon as a WarehouseItem changes. Pass ``use_cache=False`` for a fresh
+    snapshot.
+    """
+    if not use_cache:
+        return _valuation()
+    return cached_catalog(
+        'valuation',
+        (),
+        _valuation,
+        timeout=get_valuation_cache_ttl()
+    )
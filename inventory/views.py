@@ -2,11 +2,26 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from .models import WarehouseItem, DealerStock, StockRequest
+from django.core.paginator import Paginator
+from .models import WarehouseItem, DealerStock, StockMovement, StockRequest
+from .movements import record_movements
+from .stock_approval import approve_stock_request, approve_stock_requests, reject_stock_request
+from .stock_requests import submit_stock_requests
+from .catalog_import import CatalogImportError, import_catalog, read_catalog
+from .search import autocomplete, catalog_search
+from .valuation import inventory_valuation, stock_value
 from accounts.models import User
-from django.db.models import Sum
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Avg, Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from urllib.parse import urlencode
 import json
 
+STOCK_PAGE_SIZE = 50
+DEALER_STOCK_PAGE_SIZE = 50
+LOW_STOCK_LIST_SIZE = 50
+IMPORT_ERRORS_SHOWN = 100
+
 @login_required
 def dealer_stock_view(request):
     """View dealer's stock inventory"""
@@ -14,33 +29,86 @@ def dealer_stock_view(request):
         messages.error(request, "Access denied. Dealer access required.")
         return redirect('dashboard:index')
     
-    dealer_stocks = DealerStock.objects.filter(dealer=request.user).select_related('item')
-    
-    # Calculate statistics and add total_value to each stock item
-    for stock in dealer_stocks:
-        stock.total_value = stock.quantity * stock.selling_price
-    
-    total_items = dealer_stocks.count()
-    total_value = sum(stock.total_value for stock in dealer_stocks)
-    total_available = sum(stock.available_quantity for stock in dealer_stocks)
-    
-    # Low stock alerts
-    low_stock_items = [stock for stock in dealer_stocks if stock.available_quantity < 5]
-    
-    # Recently updated items
-    recent_items = dealer_stocks.order_by('-updated_at')[:5]
+    dealer_stocks = DealerStock.objects.filter(dealer=request.user)
+    line_value = ExpressionWrapper(F('quantity') * F('selling_price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    
+    # Statistics from one aggregate query over the stored available_quantity column
+    stats = dealer_stocks.aggregate(
+        total_items=Count('id'),
+        total_value=Sum(line_value),
+        total_available=Sum('available_quantity'),
+        low_stock_count=Count('id', filter=Q(needs_reorder=True)),
+        out_of_stock_count=Count('id', filter=Q(available_quantity__lte=0)),
+    )
+    
+    # Optional filters, applied in SQL on the (dealer, available_quantity) index
+    stock_list = dealer_stocks
+    low_stock_only = request.GET.get('low_stock') == '1'
+    available_below = request.GET.get('available_below', '').strip()
+    if low_stock_only:
+        stock_list = stock_list.filter(needs_reorder=True)
+    if available_below.isdigit():
+        stock_list = stock_list.filter(available_quantity__lt=int(available_below))
+    else:
+        available_below = ''
+    filtered = low_stock_only or bool(available_below)
+    
+    stock_list = stock_list.select_related('item').annotate(total_value=line_value).order_by(
+        'available_quantity' if filtered else '-updated_at', 'pk'
+    )
+    paginator = Paginator(stock_list, DEALER_STOCK_PAGE_SIZE)
+    if not filtered:
+        # The unfiltered count is already known, so the paginator does not need its own COUNT query
+        paginator.count = stats['total_items']
+    page = paginator.get_page(request.GET.get('page'))
+    
+    page_params = {}
+    if low_stock_only:
+        page_params['low_stock'] = '1'
+    if available_below:
+        page_params['available_below'] = available_below
     
     context = {
-        'dealer_stocks': dealer_stocks,
-        'total_items': total_items,
-        'total_value': total_value,
-        'total_available': total_available,
-        'low_stock_items': low_stock_items,
-        'recent_items': recent_items,
+        'dealer_stocks': page,
+        'page_range': paginator.get_elided_page_range(page.number),
+        'page_query': urlencode(page_params),
+        'total_items': stats['total_items'],
+        'total_value': stats['total_value'] or 0,
+        'total_available': stats['total_available'] or 0,
+        'low_stock_count': stats['low_stock_count'],
+        'out_of_stock_count': stats['out_of_stock_count'],
+        'low_stock_only': low_stock_only,
+        'available_below': available_below,
     }
     
     return render(request, 'inventory/dealer_stock.html', context)
 
+@login_required
+def dealer_stock_threshold_view(request, stock_id):
+    """Dealer sets the reorder threshold of one of their stock items"""
+    if request.user.user_type != 'dealer':
+        messages.error(request, "Access denied. Dealer access required.")
+        return redirect('dashboard:index')
+    
+    if request.method == 'POST':
+        try:
+            reorder_threshold = int(request.POST.get('reorder_threshold'))
+            if reorder_threshold < 0:
+                raise ValueError("Reorder threshold cannot be negative")
+            
+            updated = DealerStock.objects.filter(id=stock_id, dealer=request.user).update(
+                reorder_threshold=reorder_threshold,
+                updated_at=timezone.now()
+            )
+            if updated:
+                messages.success(request, "Reorder threshold updated.")
+            else:
+                messages.error(request, "Stock item not found.")
+        except (TypeError, ValueError) as e:
+            messages.error(request, f"Error updating reorder threshold: {str(e)}")
+    
+    return redirect('inventory:dealer_stock')
+
 @login_required
 def stock_request_view(request):
     """Request stock from admin"""
@@ -51,31 +119,17 @@ def stock_request_view(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            item_id = data.get('item_id')
+            item_id = int(data.get('item_id'))
             quantity = int(data.get('quantity'))
             reason = data.get('reason', '')
             
-            item = get_object_or_404(WarehouseItem, id=item_id)
+            result = submit_stock_requests(request.user, [(item_id, quantity)], reason)
+            if result['failed']:
+                return JsonResponse({'success': False, 'error': result['failed'][item_id]})
             
-            # Check if request already exists
-            existing_request = StockRequest.objects.filter(
-                dealer=request.user, 
-                item=item, 
-                status='pending'
-            ).first()
-            
-            if existing_request:
-                existing_request.quantity_requested = quantity
-                existing_request.reason = reason
-                existing_request.save()
+            if result['updated']:
                 messages.success(request, "Stock request updated successfully.")
             else:
-                StockRequest.objects.create(
-                    dealer=request.user,
-                    item=item,
-                    quantity_requested=quantity,
-                    reason=reason
-                )
                 messages.success(request, "Stock request submitted successfully.")
                 
             return JsonResponse({'success': True})
@@ -88,14 +142,49 @@ def stock_request_view(request):
         dealer=request.user, 
         status='pending'
     ).select_related('item')
+    suggested_requests = StockRequest.objects.filter(
+        dealer=request.user, 
+        status='draft'
+    ).select_related('item').order_by('item__name')
     
     context = {
         'warehouse_items': warehouse_items,
         'pending_requests': pending_requests,
+        'suggested_requests': suggested_requests,
     }
     
     return render(request, 'inventory/stock_request.html', context)
 
+@login_required
+def stock_request_batch_view(request):
+    """Dealer submits stock requests for many items at once"""
+    if request.user.user_type != 'dealer':
+        return JsonResponse({'success': False, 'error': 'Dealer access required'}, status=403)
+    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'POST required'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+        lines = [(int(line['item_id']), int(line['quantity'])) for line in data.get('items', [])]
+        if not lines:
+            return JsonResponse({'success': False, 'error': 'No items to request'}, status=400)
+        
+        result = submit_stock_requests(request.user, lines, data.get('reason', ''))
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    submitted = len(result['created']) + len(result['updated'])
+    if submitted:
+        messages.success(request, f"{submitted} stock request{'s' if submitted != 1 else ''} submitted successfully.")
+    
+    return JsonResponse({
+        'success': True,
+        'created': result['created'],
+        'updated': result['updated'],
+        'failed': {str(item_id): reason for item_id, reason in result['failed'].items()},
+    })
+
 @login_required
 def admin_stock_view(request):
     """Admin view of warehouse stock"""
@@ -103,42 +192,130 @@ def admin_stock_view(request):
         messages.error(request, "Access denied. Admin access required.")
         return redirect('dashboard:index')
     
-    warehouse_items = WarehouseItem.objects.all()
-    
-    # Calculate total value and add total_value property to each item
-    for item in warehouse_items:
-        item.total_value = item.quantity * item.unit_price
+    # Totals, averages and category insights from one aggregate query
+    valuation = inventory_valuation()
     
-    total_value = sum(item.total_value for item in warehouse_items)
+    # Item list with its value computed by the database, one page at a time
+    warehouse_items = WarehouseItem.objects.annotate(total_value=stock_value())
+    paginator = Paginator(warehouse_items, STOCK_PAGE_SIZE)
+    # The count is already known, so the paginator does not need its own COUNT query
+    paginator.count = valuation['total_items']
+    page = paginator.get_page(request.GET.get('page'))
     
-    # Low stock alerts
-    low_stock_items = warehouse_items.filter(quantity__lt=10)
+    # Items below their reorder threshold, most urgent first, straight off the (needs_reorder, quantity) index
+    low_stock_items = WarehouseItem.objects.filter(needs_reorder=True).order_by('quantity')[:LOW_STOCK_LIST_SIZE]
     
     # Additional statistics
     stock_requests_count = StockRequest.objects.filter(status='pending').count()
     
-    # Calculate averages and insights
-    avg_item_value = total_value / warehouse_items.count() if warehouse_items.count() > 0 else 0
-    highest_value_item = max([item.unit_price for item in warehouse_items]) if warehouse_items.exists() else 0
-    
-    # Most stocked category
-    from django.db.models import Count
-    category_counts = warehouse_items.values('category').annotate(count=Count('id')).order_by('-count')
-    most_stocked_category = category_counts.first()['category'] if category_counts.exists() else None
-    
     context = {
-        'warehouse_items': warehouse_items,
-        'total_items': warehouse_items.count(),
-        'total_value': total_value,
+        'warehouse_items': page,
+        'total_items': valuation['total_items'],
+        'total_value': valuation['total_value'],
         'low_stock_items': low_stock_items,
+        'low_stock_count': valuation['low_stock_count'],
         'stock_requests_count': stock_requests_count,
-        'avg_item_value': avg_item_value,
-        'highest_value_item': highest_value_item,
-        'most_stocked_category': most_stocked_category,
+        'avg_item_value': valuation['avg_item_value'],
+        'highest_value_item': valuation['highest_unit_price'],
+        'most_stocked_category': valuation['most_stocked_category'],
+        'category_breakdown': valuation['categories'],
     }
     
     return render(request, 'inventory/admin_stock.html', context)
 
+PRODUCT_PAGE_SIZE = 25
+
+# sort parameter -> (label, ordering); a leading '-' on the parameter reverses it
+PRODUCT_SORTS = {
+    'name': ('Name', 'name'),
+    'sku': ('SKU', 'sku'),
+    'quantity': ('Quantity', 'quantity'),
+    'price': ('Unit Price', 'unit_price'),
+    'value': ('Total Value', 'total_value'),
+    'updated': ('Last Updated', 'updated_at'),
+    'created': ('Date Added', 'created_at'),
+}
+
+def _product_grid(params):
+    """
+    Filtered, sorted page of warehouse products with its statistics and category distribution.
+
+    Uses three queries whatever the catalog size: one grouped count per
+    category, one aggregate for the statistics (which also supplies the
+    paginator count) and one for the page itself. Without filters the
+    statistics come from the cached warehouse valuation instead. total_value
+    is computed by the database.
+    """
+    category = params.get('category') or None
+    search_term = (params.get('search') or '').strip()
+    sort = params.get('sort') or ('' if search_term else '-created')
+    
+    products = WarehouseItem.objects.annotate(total_value=stock_value())
+    if search_term or category:
+        products, category_facets = catalog_search(products, search_term, category)
+        stats = None
+    else:
+        # The unfiltered grid reuses the cached warehouse valuation
+        valuation = inventory_valuation()
+        category_facets = [
+            {'value': row['category'], 'label': row['label'], 'count': row['items']}
+            for row in valuation['categories']
+        ]
+        stats = {
+            'total': valuation['total_items'],
+            'avg_price': valuation['avg_unit_price'],
+            'total_value': valuation['total_value'],
+            'out_of_stock': valuation['out_of_stock_count'],
+        }
+    
+    # Relevance order for searches unless a sort is picked explicitly
+    if sort.lstrip('-') in PRODUCT_SORTS:
+        field = PRODUCT_SORTS[sort.lstrip('-')][1]
+        # Tie-break in the same direction so an index on the field can serve the whole ordering
+        direction = '-' if sort.startswith('-') else ''
+        products = products.order_by(f"{direction}{field}", f"{direction}pk")
+    else:
+        sort = ''
+    
+    if stats is None:
+        stats = products.aggregate(
+            total=Count('id'),
+            avg_price=Avg('unit_price'),
+            total_value=Sum(stock_value()),
+            out_of_stock=Count('id', filter=Q(quantity__lte=0)),
+        )
+    
+    try:
+        page_size = min(max(int(params.get('page_size', PRODUCT_PAGE_SIZE)), 1), 100)
+    except ValueError:
+        page_size = PRODUCT_PAGE_SIZE
+    paginator = Paginator(products, page_size)
+    paginator.count = stats['total']
+    page = paginator.get_page(params.get('page'))
+    
+    # Distribution of the matching products across categories
+    matching = sum(facet['count'] for facet in category_facets)
+    category_distribution = [
+        {
+            'name': facet['label'],
+            'count': facet['count'],
+            'percentage': round(facet['count'] / matching * 100, 1) if matching else 0
+        }
+        for facet in category_facets
+    ]
+    
+    return {
+        'page': page,
+        'category': category,
+        'search_term': search_term,
+        'sort': sort,
+        'category_facets': category_facets,
+        'category_distribution': category_distribution,
+        'avg_price': stats['avg_price'] or 0,
+        'total_value': stats['total_value'] or 0,
+        'out_of_stock_count': stats['out_of_stock'],
+    }
+
 @login_required
 def product_management_view(request):
     """Manage products in warehouse"""
@@ -146,53 +323,80 @@ def product_management_view(request):
         messages.error(request, "Access denied. Admin access required.")
         return redirect('dashboard:index')
     
-    products = WarehouseItem.objects.all()
-    
-    # Add total_value to each product
-    for product in products:
-        product.total_value = product.quantity * product.unit_price
-    
-    # Filter by category if specified
-    category = request.GET.get('category')
-    if category:
-        products = products.filter(category=category)
-    
-    # Search functionality
-    search_term = request.GET.get('search')
-    if search_term:
-        products = products.filter(
-            models.Q(name__icontains=search_term) | 
-            models.Q(sku__icontains=search_term) |
-            models.Q(description__icontains=search_term)
-        )
+    grid = _product_grid(request.GET)
     
-    # Additional statistics
-    from django.db.models import Avg, Count
-    avg_price = products.aggregate(Avg('unit_price'))['unit_price__avg'] or 0
-    out_of_stock = products.filter(quantity=0)
-    
-    # Category distribution
-    category_distribution = []
-    for value, label in WarehouseItem.CATEGORY_CHOICES:
-        count = products.filter(category=value).count()
-        percentage = (count / products.count() * 100) if products.count() > 0 else 0
-        category_distribution.append({
-            'name': label,
-            'count': count,
-            'percentage': round(percentage, 1)
-        })
+    # Keep the filters and sort on the pagination links
+    filters = {key: value for key, value in [('category', grid['category']), ('search', grid['search_term']), ('sort', grid['sort'])] if value}
     
     context = {
-        'products': products,
+        'products': grid['page'],
+        'page_range': grid['page'].paginator.get_elided_page_range(grid['page'].number, on_each_side=2),
+        'page_query': urlencode(filters),
         'categories': WarehouseItem.CATEGORY_CHOICES,
-        'filter_category': category,
-        'avg_price': avg_price,
-        'out_of_stock': out_of_stock,
-        'category_distribution': category_distribution,
+        'sort_options': [(key, label) for key, (label, _) in PRODUCT_SORTS.items()],
+        'filter_category': grid['category'],
+        'filter_sort': grid['sort'],
+        'avg_price': grid['avg_price'],
+        'total_value': grid['total_value'],
+        'out_of_stock_count': grid['out_of_stock_count'],
+        'category_distribution': grid['category_distribution'],
+        'category_facets': grid['category_facets'],
     }
     
     return render(request, 'inventory/product_management.html', context)
 
+@login_required
+def product_grid_api(request):
+    """JSON version of the product management grid"""
+    if request.user.user_type != 'admin':
+        return JsonResponse({'success': False, 'error': 'Admin access required'}, status=403)
+    
+    grid = _product_grid(request.GET)
+    page = grid['page']
+    
+    return JsonResponse({
+        'success': True,
+        'results': list(page.object_list.values(
+            'id', 'name', 'sku', 'category', 'quantity', 'unit_price', 'total_value', 'updated_at'
+        )),
+        'page': page.number,
+        'num_pages': page.paginator.num_pages,
+        'count': page.paginator.count,
+        'sort': grid['sort'],
+        'avg_price': grid['avg_price'],
+        'total_value': grid['total_value'],
+        'out_of_stock_count': grid['out_of_stock_count'],
+        'facets': grid['category_facets'],
+    })
+
+@login_required
+def product_search_api(request):
+    """Ranked product search with per-category facet counts"""
+    products = WarehouseItem.objects.all()
+    if request.user.user_type != 'admin':
+        products = products.filter(quantity__gt=0)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    
+    results, facets = catalog_search(products, request.GET.get('q'), request.GET.get('category'))
+    
+    return JsonResponse({
+        'results': list(results.values('id', 'name', 'sku', 'category', 'unit_price', 'quantity')[:limit]),
+        'facets': facets,
+    })
+
+@login_required
+def product_autocomplete_api(request):
+    """Prefix suggestions for the product search boxes"""
+    products = WarehouseItem.objects.all()
+    if request.user.user_type != 'admin':
+        products = products.filter(quantity__gt=0)
+    
+    return JsonResponse({'results': autocomplete(products, request.GET.get('q'))})
+
 @login_required
 def product_create_view(request):
     """Create new product"""
@@ -208,21 +412,31 @@ def product_create_view(request):
             quantity = int(request.POST.get('quantity', 0))
             unit_price = float(request.POST.get('unit_price', 0))
             description = request.POST.get('description', '')
+            reorder_threshold = int(request.POST.get('reorder_threshold') or WarehouseItem.DEFAULT_REORDER_THRESHOLD)
             
             # Check if SKU already exists
             if WarehouseItem.objects.filter(sku=sku).exists():
                 messages.error(request, "SKU already exists.")
                 return redirect('inventory:product_create')
             
-            WarehouseItem.objects.create(
-                name=name,
-                category=category,
-                sku=sku,
-                quantity=quantity,
-                unit_price=unit_price,
-                description=description,
-                updated_by=request.user
-            )
+            with transaction.atomic():
+                product = WarehouseItem.objects.create(
+                    name=name,
+                    category=category,
+                    sku=sku,
+                    quantity=quantity,
+                    unit_price=unit_price,
+                    description=description,
+                    reorder_threshold=reorder_threshold,
+                    updated_by=request.user
+                )
+                record_movements([StockMovement(
+                    item=product,
+                    movement_type='adjustment',
+                    quantity_change=quantity,
+                    reference='created',
+                    created_by=request.user
+                )])
             
             messages.success(request, "Product created successfully.")
             return redirect('inventory:product_management')
@@ -231,10 +445,46 @@ def product_create_view(request):
     
     context = {
         'categories': WarehouseItem.CATEGORY_CHOICES,
+        'default_reorder_threshold': WarehouseItem.DEFAULT_REORDER_THRESHOLD,
     }
     
     return render(request, 'inventory/product_form.html', context)
 
+@login_required
+def product_import_view(request):
+    """Bulk create or update products from an uploaded CSV/XLSX catalog"""
+    if request.user.user_type != 'admin':
+        messages.error(request, "Access denied. Admin access required.")
+        return redirect('dashboard:index')
+    
+    result = None
+    if request.method == 'POST':
+        upload = request.FILES.get('catalog')
+        if not upload:
+            messages.error(request, "Please choose a catalog file to import.")
+            return redirect('inventory:product_import')
+        
+        try:
+            result = import_catalog(read_catalog(upload, upload.name), updated_by=request.user)
+            messages.success(
+                request,
+                f"Import finished: {result['created']} product(s) created, {result['updated']} updated."
+            )
+            if result['errors']:
+                messages.warning(request, f"{len(result['errors'])} row(s) were rejected.")
+        except CatalogImportError as e:
+            messages.error(request, str(e))
+        except Exception as e:
+            messages.error(request, f"Error importing catalog: {str(e)}")
+    
+    context = {
+        'result': result,
+        'import_errors': result['errors'][:IMPORT_ERRORS_SHOWN] if result else [],
+        'categories': WarehouseItem.CATEGORY_CHOICES,
+    }
+    
+    return render(request, 'inventory/product_import.html', context)
+
 @login_required
 def product_edit_view(request, product_id):
     """Edit existing product"""
@@ -246,14 +496,29 @@ def product_edit_view(request, product_id):
     
     if request.method == 'POST':
         try:
-            product.name = request.POST.get('name')
-            product.category = request.POST.get('category')
-            product.sku = request.POST.get('sku')
-            product.quantity = int(request.POST.get('quantity', 0))
-            product.unit_price = float(request.POST.get('unit_price', 0))
-            product.description = request.POST.get('description', '')
-            product.updated_by = request.user
-            product.save()
+            quantity = int(request.POST.get('quantity', 0))
+            unit_price = float(request.POST.get('unit_price', 0))
+            with transaction.atomic():
+                # Read the quantity under the row lock so a concurrent sale or
+                # approval between the read and the save lands in the movement
+                product = WarehouseItem.objects.select_for_update().get(pk=product.pk)
+                previous_quantity = product.quantity
+                product.name = request.POST.get('name')
+                product.category = request.POST.get('category')
+                product.sku = request.POST.get('sku')
+                product.quantity = quantity
+                product.unit_price = unit_price
+                product.description = request.POST.get('description', '')
+                product.reorder_threshold = int(request.POST.get('reorder_threshold') or product.reorder_threshold)
+                product.updated_by = request.user
+                product.save()
+                record_movements([StockMovement(
+                    item=product,
+                    movement_type='adjustment',
+                    quantity_change=product.quantity - previous_quantity,
+                    reference='edited',
+                    created_by=request.user
+                )])
             
             messages.success(request, "Product updated successfully.")
             return redirect('inventory:product_management')
@@ -263,6 +528,7 @@ def product_edit_view(request, product_id):
     context = {
         'product': product,
         'categories': WarehouseItem.CATEGORY_CHOICES,
+        'default_reorder_threshold': WarehouseItem.DEFAULT_REORDER_THRESHOLD,
     }
     
     return render(request, 'inventory/product_form.html', context)
@@ -274,7 +540,8 @@ def stock_requests_view(request):
         messages.error(request, "Access denied. Admin access required.")
         return redirect('dashboard:index')
     
-    requests = StockRequest.objects.select_related('dealer', 'item').order_by('-created_at')
+    # Drafts are forecast suggestions only the dealer sees until they submit them
+    requests = StockRequest.objects.exclude(status='draft').select_related('dealer', 'item').order_by('-created_at')
     
     # Filter by status if specified
     status = request.GET.get('status')
@@ -303,40 +570,13 @@ def approve_stock_request_view(request, request_id):
             quantity_approved = request.POST.get('quantity_approved')
             comments = request.POST.get('comments', '')
             
+            # Locked and applied with F() updates in one transaction, so concurrent approvals cannot oversell
             if action == 'approve':
-                if quantity_approved:
-                    approved_qty = int(quantity_approved)
-                    stock_request.quantity_approved = approved_qty
-                    stock_request.status = 'partially_approved' if approved_qty < stock_request.quantity_requested else 'approved'
-                else:
-                    stock_request.quantity_approved = stock_request.quantity_requested
-                    stock_request.status = 'approved'
-                
-                # Update warehouse stock
-                stock_request.item.quantity -= stock_request.quantity_approved
-                stock_request.item.save()
-                
-                # Update or create dealer stock
-                dealer_stock, created = DealerStock.objects.get_or_create(
-                    dealer=stock_request.dealer,
-                    item=stock_request.item,
-                    defaults={
-                        'quantity': stock_request.quantity_approved,
-                        'selling_price': stock_request.item.unit_price * 1.2  # 20% markup
-                    }
-                )
-                
-                if not created:
-                    dealer_stock.quantity += stock_request.quantity_approved
-                    dealer_stock.save()
-                
+                approve_stock_request(stock_request, request.user, int(quantity_approved) if quantity_approved else None)
             else:  # reject
-                stock_request.status = 'rejected'
+                reject_stock_request(stock_request, request.user)
             
-            stock_request.approved_by = request.user
-            stock_request.save()
-            
-            messages.success(request, f"Stock request {action}d successfully.")
+            messages.success(request, f"Stock request {'approved' if action == 'approve' else 'rejected'} successfully.")
             return redirect('inventory:stock_requests')
         except Exception as e:
             messages.error(request, f"Error processing request: {str(e)}")
@@ -346,3 +586,54 @@ def approve_stock_request_view(request, request_id):
     }
     
     return render(request, 'inventory/approve_request.html', context)
+
+@login_required
+def bulk_approve_stock_requests_view(request):
+    """Admin approves a batch of pending stock requests at once"""
+    if request.user.user_type != 'admin':
+        messages.error(request, "Access denied. Admin access required.")
+        return redirect('dashboard:index')
+    
+    if request.method != 'POST':
+        return redirect('inventory:stock_requests')
+    
+    is_json = request.content_type == 'application/json'
+    try:
+        if is_json:
+            data = json.loads(request.body)
+            request_ids = [int(request_id) for request_id in data.get('request_ids', [])]
+            quantities = {int(request_id): int(quantity) for request_id, quantity in data.get('quantities', {}).items()}
+        else:
+            request_ids = [int(request_id) for request_id in request.POST.getlist('request_ids')]
+            quantities = {
+                request_id: int(request.POST[f'quantity_{request_id}'])
+                for request_id in request_ids
+                if request.POST.get(f'quantity_{request_id}')
+            }
+        
+        approved, failures = approve_stock_requests(request_ids, request.user, quantities)
+    except Exception as e:
+        if is_json:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        messages.error(request, f"Error approving requests: {str(e)}")
+        return redirect('inventory:stock_requests')
+    
+    if is_json:
+        return JsonResponse({
+            'success': True,
+            'approved': [
+                {
+                    'id': stock_request.id,
+                    'status': stock_request.status,
+                    'quantity_approved': stock_request.quantity_approved,
+                }
+                for stock_request in approved
+            ],
+            'failed': {str(request_id): reason for request_id, reason in failures.items()},
+        })
+    
+    if approved:
+        messages.success(request, f"{len(approved)} stock request{'s' if len(approved) != 1 else ''} approved successfully.")
+    if failures:
+        messages.error(request, f"{len(failures)} stock request{'s' if len(failures) != 1 else ''} could not be approved.")
+    return redirect('inventory:stock_requests')
@@ -0,0 +1,237 @@
+from datetime import date, timedelta
+from django.utils import timezone
+from .models import SalesReport, InventoryReport, ServiceReportSummary, PerformanceReport
+from .performance import KPI_QUERIES, generate_performance_reports
+from sales.rollups import category_revenue, sales_totals, top_dealers, top_items
+from inventory.models import DealerStock, WarehouseItem
+from inventory.movements import movement_report
+from inventory.valuation import inventory_valuation
+from services.models import ServiceBooking
+from accounts.models import User
+from django.db.models import Count, DecimalField, F, Q, Sum
+
+# Rows kept in a sales report's top items and top dealers lists
+TOP_RANKING_SIZE = 10
+# Lowest stock lines listed in an inventory report; the total count is stored as well
+LOW_STOCK_REPORT_SIZE = 100
+LOW_STOCK_FIELDS = ('item_id', 'sku', 'name', 'category', 'quantity', 'reorder_threshold')
+
+
+def _no_progress(percent):
+    pass
+
+
+def build_sales_report(user, params, progress=_no_progress):
+    """
+    Sales totals, top items, top dealers and revenue per category from the daily rollups.
+
+    Dealer users get their own sales only and no dealer ranking. Everything
+    is stored on the report, so viewing it later does not aggregate again.
+    """
+    start_date = date.fromisoformat(params['start_date'])
+    end_date = date.fromisoformat(params['end_date'])
+    dealer = user if user.user_type == 'dealer' else None
+
+    totals = sales_totals(start_date, end_date, dealer=dealer)
+    progress(25)
+
+    top_selling_items = [
+        {
+            'item__name': row['item__name'],
+            'total_quantity': row['total_quantity'],
+            'total_revenue': float(row['total_revenue']),
+        }
+        for row in top_items(start_date, end_date, dealer=dealer, limit=TOP_RANKING_SIZE)
+    ]
+    progress(50)
+
+    categories = {
+        row['item__category']: {
+            'total_quantity': row['total_quantity'],
+            'total_revenue': float(row['total_revenue']),
+        }
+        for row in category_revenue(start_date, end_date, dealer=dealer)
+    }
+    progress(75)
+
+    top_performing_dealers = []
+    if dealer is None:
+        top_performing_dealers = [
+            {
+                'dealer__username': row['dealer__username'],
+                'total_sales': float(row['total_sales']),
+                'transaction_count': row['transaction_count'],
+            }
+            for row in top_dealers(start_date, end_date, limit=TOP_RANKING_SIZE)
+        ]
+
+    return SalesReport.objects.create(
+        report_type=params['report_type'],
+        start_date=start_date,
+        end_date=end_date,
+        total_sales=totals['total_sales'],
+        total_transactions=totals['total_transactions'],
+        top_selling_items=top_selling_items,
+        top_performing_dealers=top_performing_dealers,
+        category_revenue=categories,
+        generated_by=user
+    )
+
+
+def build_inventory_report(user, params, progress=_no_progress):
+    """
+    Warehouse valuation, per-dealer stock and the low-stock list, all from database aggregates.
+
+    Movement reports add the ledger per period. Dealer users get their own
+    stock line and low-stock list; admins get every dealer and the
+    warehouse's low-stock list.
+    """
+    report_type = params['report_type']
+
+    # Generate warehouse summary from one aggregate query, fresh for the snapshot
+    valuation = inventory_valuation(use_cache=False)
+    warehouse_summary = {
+        'total_items': valuation['total_items'],
+        'total_value': float(valuation['total_value']),
+        'low_stock_count': valuation['low_stock_count'],
+        'out_of_stock_count': valuation['out_of_stock_count'],
+        'categories': [
+            {
+                'category': category['category'],
+                'items': category['items'],
+                'quantity': category['quantity'],
+                'value': float(category['value']),
+            }
+            for category in valuation['categories']
+        ],
+    }
+    progress(40)
+
+    # Movement reports add the ledger summed per period for the chosen dates
+    if report_type == 'movement':
+        end_date = date.fromisoformat(params.get('end_date') or timezone.localdate().isoformat())
+        start_date = date.fromisoformat(params.get('start_date') or (end_date - timedelta(days=30)).isoformat())
+        warehouse_summary['movements'] = movement_report(
+            start_date,
+            end_date,
+            period=params.get('period') or 'day',
+            dealer=user if user.user_type == 'dealer' else None
+        )
+    progress(70)
+
+    # Per-dealer stock from one GROUP BY over DealerStock; dealers only see their own line.
+    # Available and low stock repeat the generated columns' expressions so the
+    # covering (dealer, quantity, ...) index answers the whole query.
+    dealer_stocks = DealerStock.objects.all()
+    if user.user_type == 'dealer':
+        dealer_stocks = dealer_stocks.filter(dealer=user)
+    dealers = list(dealer_stocks.values('dealer_id').annotate(
+        items=Count('id'),
+        total_quantity=Sum('quantity'),
+        total_available=Sum(F('quantity') - F('allocated_quantity')),
+        total_value=Sum(F('quantity') * F('selling_price'), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        low_stock_count=Count('id', filter=Q(quantity__lt=F('allocated_quantity') + F('reorder_threshold'))),
+    ).order_by('-total_value'))
+    usernames = dict(User.objects.filter(pk__in=[row['dealer_id'] for row in dealers]).values_list('pk', 'username'))
+    dealer_summary = {
+        'total_dealers': User.objects.filter(user_type='dealer').count() if user.user_type == 'admin' else len(dealers),
+        'total_dealer_items': sum(row['items'] for row in dealers),
+        'total_dealer_quantity': sum(row['total_quantity'] for row in dealers),
+        'total_dealer_value': float(sum(row['total_value'] for row in dealers)),
+        'dealers': [
+            {
+                'dealer_id': row['dealer_id'],
+                'username': usernames.get(row['dealer_id']),
+                'items': row['items'],
+                'quantity': row['total_quantity'],
+                'available': row['total_available'],
+                'value': float(row['total_value']),
+                'low_stock_count': row['low_stock_count'],
+            }
+            for row in dealers
+        ],
+    }
+    progress(85)
+
+    # Lowest stock first, read through the needs_reorder indexes
+    if user.user_type == 'dealer':
+        low_stock = DealerStock.objects.filter(dealer=user, needs_reorder=True).order_by('available_quantity').values_list(
+            'item_id', 'item__sku', 'item__name', 'item__category', 'available_quantity', 'reorder_threshold'
+        )[:LOW_STOCK_REPORT_SIZE]
+        low_stock_count = sum(row['low_stock_count'] for row in dealers)
+    else:
+        low_stock = WarehouseItem.objects.filter(needs_reorder=True).order_by('quantity').values_list(
+            'id', 'sku', 'name', 'category', 'quantity', 'reorder_threshold'
+        )[:LOW_STOCK_REPORT_SIZE]
+        low_stock_count = valuation['low_stock_count']
+    low_stock_items = {
+        'total': low_stock_count,
+        'items': [dict(zip(LOW_STOCK_FIELDS, row)) for row in low_stock],
+    }
+
+    return InventoryReport.objects.create(
+        report_type=report_type,
+        warehouse_summary=warehouse_summary,
+        dealer_stock_summary=dealer_summary,
+        low_stock_items=low_stock_items,
+        generated_by=user
+    )
+
+
+def build_service_report(user, params, progress=_no_progress):
+    """Service booking counts and revenue for bookings created in the period"""
+    start_date = date.fromisoformat(params['start_date'])
+    end_date = date.fromisoformat(params['end_date'])
+
+    bookings = ServiceBooking.objects.filter(
+        created_at__date__range=[start_date, end_date]
+    )
+
+    completed_services = bookings.filter(status='completed').count()
+    total_revenue = bookings.filter(status='completed').aggregate(
+        total=Sum('actual_cost')
+    )['total'] or 0
+    progress(60)
+
+    return ServiceReportSummary.objects.create(
+        report_type=params['report_type'],
+        start_date=start_date,
+        end_date=end_date,
+        total_bookings=bookings.count(),
+        completed_services=completed_services,
+        pending_services=bookings.exclude(status='completed').count(),
+        total_revenue=total_revenue,
+        average_service_cost=float(total_revenue / completed_services) if completed_services > 0 else 0,
+        generated_by=user
+    )
+
+
+def build_performance_report(user, params, progress=_no_progress):
+    """
+    Performance reports for every user of the chosen target type, or of all types when it is 'all'.
+
+    Returns the top-ranked report of the first type so the job can link to it.
+    """
+    period_start = date.fromisoformat(params['period_start'])
+    period_end = date.fromisoformat(params['period_end'])
+    target_type = params.get('target_type') or 'all'
+    target_types = list(KPI_QUERIES) if target_type == 'all' else [target_type]
+    if any(target_type not in KPI_QUERIES for target_type in target_types):
+        raise ValueError(f"Unknown target type: {params.get('target_type')}")
+
+    finished = []
+
+    def type_done(target_type):
+        finished.append(target_type)
+        progress(90 * len(finished) // len(target_types))
+
+    written = generate_performance_reports(period_start, period_end, user, target_types, progress=type_done)
+    first_type = next((target_type for target_type in target_types if written[target_type]), None)
+    if first_type is None:
+        raise ValueError("No users to report on for this target type")
+
+    return PerformanceReport.objects.filter(
+        target_type=first_type,
+        period_start=period_start,
+        period_end=period_end
+    ).order_by('ranking', 'pk').first()
@@ -0,0 +1,110 @@
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .builders import build_inventory_report, build_performance_report, build_sales_report, build_service_report
+from .models import ReportJob
+
+BUILDERS = {
+    'sales': build_sales_report,
+    'inventory': build_inventory_report,
+    'service': build_service_report,
+    'performance': build_performance_report,
+}
+
+# URL name of the page showing each kind's finished report
+REPORT_VIEWS = {
+    'sales': 'reports:view_sales_report',
+    'inventory': 'reports:view_inventory_report',
+    'service': 'reports:view_service_report',
+    'performance': 'reports:view_performance_report',
+}
+
+# A running job whose worker has not sent a heartbeat for this long is
+# assumed dead and is queued again, up to MAX_ATTEMPTS runs in total
+STALE_AFTER = timedelta(seconds=getattr(settings, 'REPORT_JOB_STALE_SECONDS', 600))
+MAX_ATTEMPTS = getattr(settings, 'REPORT_JOB_MAX_ATTEMPTS', 3)
+# Workers beat several times per STALE_AFTER, so one slow query never makes a live job look dead
+HEARTBEAT_INTERVAL = STALE_AFTER.total_seconds() / 5
+
+
+def enqueue_report(report_kind, params, requested_by):
+    """Queue a report for the workers and return its ReportJob"""
+    if report_kind not in BUILDERS:
+        raise ValueError(f"Unknown report kind: {report_kind}")
+    return ReportJob.objects.create(report_kind=report_kind, params=params, requested_by=requested_by)
+
+
+def requeue_stale_jobs():
+    """Hand running jobs from dead workers back to the queue, or fail them after MAX_ATTEMPTS; returns how many were requeued"""
+    stale = ReportJob.objects.filter(status='running', heartbeat_at__lt=timezone.now() - STALE_AFTER)
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed', error="Worker stopped responding", finished_at=timezone.now()
+    )
+    return stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='queued', progress=0, worker='')
+
+
+def claim_job(worker):
+    """
+    Take the oldest queued job, mark it running for ``worker`` and return it, or None when the queue is empty.
+
+    skip_locked lets concurrent workers pass over a row another worker is
+    claiming instead of waiting for it, so every job is claimed exactly once.
+    """
+    with transaction.atomic():
+        job = ReportJob.objects.select_for_update(skip_locked=True).filter(
+            status='queued'
+        ).order_by('created_at', 'pk').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        ReportJob.objects.filter(pk=job.pk).update(
+            status='running', worker=worker, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+    job.refresh_from_db()
+    return job
+
+
+def _heartbeat(owned, stop):
+    """Refresh the job's heartbeat every HEARTBEAT_INTERVAL until ``stop`` is set or the job is no longer ours"""
+    try:
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            if not owned.update(heartbeat_at=timezone.now()):
+                return
+    finally:
+        # The thread has its own database connection
+        connection.close()
+
+
+def run_job(job):
+    """
+    Build the job's report, recording progress as it goes and the outcome at the end.
+
+    A background thread keeps the heartbeat fresh while the builder runs, so
+    long steps are not mistaken for a dead worker. Every update is limited
+    to the job while this worker still owns it: if it was requeued and
+    claimed elsewhere anyway, this run's outcome is dropped rather than
+    overwriting the new run's. Returns whether the report was built.
+    """
+    owned = ReportJob.objects.filter(pk=job.pk, worker=job.worker, status='running')
+
+    def progress(percent):
+        owned.update(progress=percent, heartbeat_at=timezone.now())
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(owned, stop), daemon=True)
+    heartbeat.start()
+    # Not wrapped in a transaction, so pollers see progress while the report is built
+    try:
+        report = BUILDERS[job.report_kind](job.requested_by, job.params, progress)
+    except Exception as e:
+        owned.update(status='failed', error=str(e), finished_at=timezone.now())
+        return False
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    owned.update(status='done', progress=100, report_id=report.pk, finished_at=timezone.now())
+    return True
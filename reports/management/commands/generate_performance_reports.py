@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounts.models import User
+from reports.performance import KPI_QUERIES, generate_performance_reports
+
+
+class Command(BaseCommand):
+    help = "Compute KPIs and rankings for every dealer, employee and service man (defaults to last month; run monthly, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day of the period (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day of the period (YYYY-MM-DD)')
+        parser.add_argument('--target-type', choices=list(KPI_QUERIES), action='append', dest='target_types',
+                            help='Only this target type (repeatable)')
+        parser.add_argument('--user', help='Username recorded as generated_by')
+
+    def handle(self, *args, **options):
+        last_month_end = timezone.localdate().replace(day=1) - timedelta(days=1)
+        try:
+            period_start = date.fromisoformat(options['start']) if options['start'] else last_month_end.replace(day=1)
+            period_end = date.fromisoformat(options['end']) if options['end'] else last_month_end
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        if period_start > period_end:
+            raise CommandError("--start must not be after --end")
+
+        generated_by = None
+        if options['user']:
+            try:
+                generated_by = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+
+        started = perf_counter()
+        written = generate_performance_reports(period_start, period_end, generated_by, options['target_types'])
+        elapsed = perf_counter() - started
+        summary = ', '.join(f"{count} {target_type}" for target_type, count in written.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Performance reports for {period_start} to {period_end}: {summary} in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,37 @@
+import os
+import socket
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from reports.jobs import claim_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Build queued reports; start several of these processes to build reports in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty instead of waiting for more jobs')
+        parser.add_argument('--interval', type=float, default=2, help='Seconds between polls while the queue is empty')
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Report worker {worker} started")
+        try:
+            while True:
+                close_old_connections()
+                job = claim_job(worker)
+                if job is None:
+                    if requeue_stale_jobs():
+                        continue
+                    if options['burst']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                started = time.monotonic()
+                ok = run_job(job)
+                status = self.style.SUCCESS('done') if ok else self.style.ERROR('failed')
+                self.stdout.write(f"{job.get_report_kind_display()} job #{job.pk} {status} in {time.monotonic() - started:.2f}s")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Report worker {worker} stopped")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesreport',
+            name='category_revenue',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -20,6 +20,7 @@ class SalesReport(models.Model):
     total_transactions = models.IntegerField(default=0)
     top_selling_items = models.JSONField(default=dict)  # Store item sales data
     top_performing_dealers = models.JSONField(default=dict)  # Store dealer performance data
+    category_revenue = models.JSONField(default=dict)  # Revenue per item category
     generated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     generated_at = models.DateTimeField(auto_now_add=True)
     
@@ -100,3 +101,41 @@ class PerformanceReport(models.Model):
     
     def __str__(self):
         return f"{self.target_type.title()} Performance Report: {self.target_user.username}"
+
+class ReportJob(models.Model):
+    """A report waiting for, or being built by, a run_report_worker process"""
+    REPORT_KIND_CHOICES = (
+        ('sales', 'Sales Report'),
+        ('inventory', 'Inventory Report'),
+        ('service', 'Service Report'),
+        ('performance', 'Performance Report'),
+    )
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    report_kind = models.CharField(max_length=20, choices=REPORT_KIND_CHOICES)
+    params = models.JSONField(default=dict)  # Form input the report is built from
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    progress = models.IntegerField(default=0)  # Percent complete
+    report_id = models.IntegerField(null=True, blank=True)  # Pk of the finished report in its kind's table
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    attempts = models.IntegerField(default=0)
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_report_kind_display()} job #{self.pk} ({self.status})"
@@ -0,0 +1,163 @@
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import (
+    Avg, Count, DecimalField, F, FilteredRelation, FloatField, Q, Sum, Value, Window
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Rank
+from accounts.models import User
+from sales.dates import period_bounds
+from common.upserts import upsert
+from .models import PerformanceReport
+
+# PerformanceReport target types and the user type each one covers
+TARGET_USER_TYPES = {
+    'dealer': 'dealer',
+    'employee': 'employee',
+    'service_man': 'service',
+}
+
+DEFAULT_TARGETS = {
+    'dealer': {'revenue': 50000, 'transactions': 25},
+    'employee': {'attendance_rate': 0.95, 'hours_worked': 160},
+    'service_man': {'completed_jobs': 20, 'avg_turnaround_hours': 48},
+}
+# Metrics where staying at or under the target counts as achieving it
+LOWER_IS_BETTER = {'avg_turnaround_hours'}
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def get_performance_targets():
+    return getattr(settings, 'PERFORMANCE_TARGETS', DEFAULT_TARGETS)
+
+
+def _dealer_kpis(period_start, period_end):
+    """(user_id, metrics, rank) per dealer from the daily sales rollups, best revenue first"""
+    rows = User.objects.filter(user_type='dealer').annotate(
+        period_sales=FilteredRelation('daily_sales', condition=Q(daily_sales__day__range=[period_start, period_end])),
+    ).annotate(
+        revenue=Coalesce(Sum('period_sales__total_sales'), Value(Decimal(0)), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        transactions=Coalesce(Sum('period_sales__transaction_count'), 0),
+    ).annotate(
+        rank=Window(Rank(), order_by=[F('revenue').desc(), F('transactions').desc()]),
+    ).values_list('pk', 'revenue', 'transactions', 'rank')
+    return [
+        (pk, {'revenue': float(revenue), 'transactions': transactions}, rank)
+        for pk, revenue, transactions, rank in rows
+    ]
+
+
+def _employee_kpis(period_start, period_end):
+    """(user_id, metrics, rank) per employee from attendance records, best attendance rate first"""
+    rows = User.objects.filter(user_type='employee').annotate(
+        period_attendance=FilteredRelation('attendances', condition=Q(attendances__date__range=[period_start, period_end])),
+    ).annotate(
+        days_recorded=Count('period_attendance'),
+        days_present=Count('period_attendance', filter=Q(period_attendance__status__in=['present', 'late'])),
+        days_late=Count('period_attendance', filter=Q(period_attendance__status='late')),
+        hours_worked=Coalesce(Sum('period_attendance__hours_worked'), Value(Decimal(0)), output_field=DecimalField(max_digits=8, decimal_places=2)),
+    ).annotate(
+        attendance_rate=Coalesce(Cast('days_present', FloatField()) / NullIf('days_recorded', 0), 0.0),
+    ).annotate(
+        rank=Window(Rank(), order_by=[F('attendance_rate').desc(), F('hours_worked').desc()]),
+    ).values_list('pk', 'days_recorded', 'days_present', 'days_late', 'hours_worked', 'attendance_rate', 'rank')
+    return [
+        (pk, {
+            'days_recorded': recorded,
+            'days_present': present,
+            'days_late': late,
+            'hours_worked': float(hours),
+            'attendance_rate': round(rate, 4),
+        }, rank)
+        for pk, recorded, present, late, hours, rate, rank in rows
+    ]
+
+
+def _service_kpis(period_start, period_end):
+    """(user_id, metrics, rank) per service man from bookings completed in the period, most jobs first"""
+    low, high = period_bounds(period_start, period_end)
+    rows = User.objects.filter(user_type='service').annotate(
+        period_jobs=FilteredRelation('assigned_services', condition=Q(
+            assigned_services__status='completed',
+            assigned_services__completed_date__gte=low,
+            assigned_services__completed_date__lt=high,
+        )),
+    ).annotate(
+        completed_jobs=Count('period_jobs'),
+        avg_turnaround=Avg(F('period_jobs__completed_date') - F('period_jobs__created_at')),
+        service_revenue=Coalesce(Sum('period_jobs__actual_cost'), Value(Decimal(0)), output_field=DecimalField(max_digits=14, decimal_places=2)),
+    ).annotate(
+        rank=Window(Rank(), order_by=[F('completed_jobs').desc(), F('avg_turnaround').asc(nulls_last=True)]),
+    ).values_list('pk', 'completed_jobs', 'avg_turnaround', 'service_revenue', 'rank')
+    return [
+        (pk, {
+            'completed_jobs': jobs,
+            'avg_turnaround_hours': round(turnaround.total_seconds() / 3600, 2) if turnaround is not None else None,
+            'service_revenue': float(revenue),
+        }, rank)
+        for pk, jobs, turnaround, revenue, rank in rows
+    ]
+
+
+KPI_QUERIES = {
+    'dealer': _dealer_kpis,
+    'employee': _employee_kpis,
+    'service_man': _service_kpis,
+}
+
+
+def _targets_achieved(metrics, targets):
+    achieved = {}
+    for metric, target in targets.items():
+        actual = metrics.get(metric)
+        if actual is None:
+            met = False
+        elif metric in LOWER_IS_BETTER:
+            met = actual <= target
+        else:
+            met = actual >= target
+        achieved[metric] = {'target': target, 'actual': actual, 'achieved': met}
+    return achieved
+
+
+def generate_performance_reports(period_start, period_end, generated_by, target_types=None, progress=None):
+    """
+    Compute KPIs for every dealer, employee and service man and upsert their PerformanceReports.
+
+    Each target type is one grouped query whose ranking comes from a RANK()
+    window, so the number of queries does not depend on the number of users.
+    All reports are then written with one bulk upsert on the (target_type,
+    target_user, period_start, period_end) key, replacing earlier runs for
+    the same period. ``progress`` is called with each finished target type.
+    Returns {target_type: reports written}.
+    """
+    targets = get_performance_targets()
+    reports = []
+    written = {}
+    for target_type in target_types or KPI_QUERIES:
+        rows = KPI_QUERIES[target_type](period_start, period_end)
+        reports.extend(
+            PerformanceReport(
+                target_type=target_type,
+                target_user_id=user_id,
+                period_start=period_start,
+                period_end=period_end,
+                kpi_metrics=metrics,
+                targets_achieved=_targets_achieved(metrics, targets.get(target_type, {})),
+                ranking=rank,
+                generated_by=generated_by
+            )
+            for user_id, metrics, rank in rows
+        )
+        written[target_type] = len(rows)
+        if progress:
+            progress(target_type)
+
+    upsert(
+        PerformanceReport,
+        reports,
+        unique_fields=['target_type', 'target_user', 'period_start', 'period_end'],
+        update_fields=['kpi_metrics', 'targets_achieved', 'ranking', 'generated_by', 'generated_at'],
+        batch_size=UPSERT_BATCH_SIZE,
+    )
+    return written
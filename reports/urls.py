@@ -19,4 +19,9 @@ urlpatterns = [
     # Performance Reports
     path("performance/generate/", views.generate_performance_report_view, name="generate_performance_report"),
     path("performance/view/<int:report_id>/", views.view_performance_report_view, name="view_performance_report"),
+    
+    # Background Report Jobs
+    path("jobs/", views.job_list_api, name="job_list"),
+    path("jobs/<int:job_id>/", views.job_status_view, name="job_status"),
+    path("jobs/<int:job_id>/status/", views.job_status_api, name="job_status_api"),
 ]
@@ -1,15 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import JsonResponse
+from django.urls import reverse
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import SalesReport, InventoryReport, ServiceReportSummary, PerformanceReport
-from sales.models import Sale
-from inventory.models import WarehouseItem, DealerStock
-from services.models import ServiceBooking
-from accounts.models import User
-from django.db.models import Count, Sum, Avg
-import json
+from .jobs import REPORT_VIEWS, enqueue_report
+from .models import SalesReport, InventoryReport, ServiceReportSummary, PerformanceReport, ReportJob
+
+JOB_LIST_SIZE = 20
+
+def _parse_date(value):
+    """Validate a YYYY-MM-DD form value before it is queued, so bad input fails in the request"""
+    return datetime.strptime(value, '%Y-%m-%d').date().isoformat()
 
 @login_required
 def generate_sales_report_view(request):
@@ -20,41 +23,16 @@ def generate_sales_report_view(request):
     
     if request.method == 'POST':
         try:
-            report_type = request.POST.get('report_type')
-            start_date = request.POST.get('start_date')
-            end_date = request.POST.get('end_date')
-            
-            start_date_parsed = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date_parsed = datetime.strptime(end_date, '%Y-%m-%d').date()
-            
-            # Filter sales based on user type
-            if request.user.user_type == 'dealer':
-                sales = Sale.objects.filter(
-                    dealer=request.user,
-                    created_at__date__range=[start_date_parsed, end_date_parsed],
-                    status='completed'
-                )
-            else:
-                sales = Sale.objects.filter(
-                    created_at__date__range=[start_date_parsed, end_date_parsed],
-                    status='completed'
-                )
-            
-            total_sales = sales.aggregate(total=Sum('total_amount'))['total'] or 0
-            total_transactions = sales.count()
-            
-            # Create report
-            report = SalesReport.objects.create(
-                report_type=report_type,
-                start_date=start_date_parsed,
-                end_date=end_date_parsed,
-                total_sales=total_sales,
-                total_transactions=total_transactions,
-                generated_by=request.user
-            )
+            params = {
+                'report_type': request.POST.get('report_type'),
+                'start_date': _parse_date(request.POST.get('start_date')),
+                'end_date': _parse_date(request.POST.get('end_date')),
+            }
             
-            messages.success(request, "Sales report generated successfully.")
-            return redirect('reports:view_sales_report', report_id=report.id)
+            # Built by a run_report_worker process; the job page polls until it is ready
+            job = enqueue_report('sales', params, request.user)
+            messages.success(request, "Sales report queued.")
+            return redirect('reports:job_status', job_id=job.id)
             
         except Exception as e:
             messages.error(request, f"Error generating report: {str(e)}")
@@ -71,8 +49,8 @@ def view_sales_report_view(request, report_id):
     """View a specific sales report"""
     report = get_object_or_404(SalesReport, id=report_id)
     
-    # Check access rights
-    if request.user.user_type == 'dealer' and report.generated_by != request.user:
+    # Check access rights; rankings are stored on the report, so this is the only query
+    if request.user.user_type == 'dealer' and report.generated_by_id != request.user.id:
         messages.error(request, "Access denied. You can only view your own reports.")
         return redirect('dashboard:index')
     
@@ -91,36 +69,16 @@ def generate_inventory_report_view(request):
     
     if request.method == 'POST':
         try:
-            report_type = request.POST.get('report_type')
-            
-            # Generate warehouse summary
-            warehouse_items = WarehouseItem.objects.all()
-            warehouse_summary = {
-                'total_items': warehouse_items.count(),
-                'total_value': float(sum(item.quantity * item.unit_price for item in warehouse_items)),
-                'low_stock_count': warehouse_items.filter(quantity__lt=10).count()
+            params = {
+                'report_type': request.POST.get('report_type'),
+                'start_date': _parse_date(request.POST.get('start_date')) if request.POST.get('start_date') else None,
+                'end_date': _parse_date(request.POST.get('end_date')) if request.POST.get('end_date') else None,
+                'period': request.POST.get('period'),
             }
             
-            # Generate dealer stock summary (for admin)
-            dealer_summary = {}
-            if request.user.user_type == 'admin':
-                dealer_stocks = DealerStock.objects.all()
-                dealer_summary = {
-                    'total_dealers': User.objects.filter(user_type='dealer').count(),
-                    'total_dealer_items': dealer_stocks.count(),
-                    'total_dealer_value': float(sum(stock.quantity * stock.selling_price for stock in dealer_stocks))
-                }
-            
-            # Create report
-            report = InventoryReport.objects.create(
-                report_type=report_type,
-                warehouse_summary=warehouse_summary,
-                dealer_stock_summary=dealer_summary,
-                generated_by=request.user
-            )
-            
-            messages.success(request, "Inventory report generated successfully.")
-            return redirect('reports:view_inventory_report', report_id=report.id)
+            job = enqueue_report('inventory', params, request.user)
+            messages.success(request, "Inventory report queued.")
+            return redirect('reports:job_status', job_id=job.id)
             
         except Exception as e:
             messages.error(request, f"Error generating report: {str(e)}")
@@ -154,38 +112,15 @@ def generate_service_report_view(request):
     
     if request.method == 'POST':
         try:
-            report_type = request.POST.get('report_type')
-            start_date = request.POST.get('start_date')
-            end_date = request.POST.get('end_date')
-            
-            start_date_parsed = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date_parsed = datetime.strptime(end_date, '%Y-%m-%d').date()
-            
-            # Get service bookings
-            bookings = ServiceBooking.objects.filter(
-                created_at__date__range=[start_date_parsed, end_date_parsed]
-            )
-            
-            completed_services = bookings.filter(status='completed').count()
-            total_revenue = bookings.filter(status='completed').aggregate(
-                total=Sum('actual_cost')
-            )['total'] or 0
-            
-            # Create report
-            report = ServiceReportSummary.objects.create(
-                report_type=report_type,
-                start_date=start_date_parsed,
-                end_date=end_date_parsed,
-                total_bookings=bookings.count(),
-                completed_services=completed_services,
-                pending_services=bookings.exclude(status='completed').count(),
-                total_revenue=total_revenue,
-                average_service_cost=float(total_revenue / completed_services) if completed_services > 0 else 0,
-                generated_by=request.user
-            )
+            params = {
+                'report_type': request.POST.get('report_type'),
+                'start_date': _parse_date(request.POST.get('start_date')),
+                'end_date': _parse_date(request.POST.get('end_date')),
+            }
             
-            messages.success(request, "Service report generated successfully.")
-            return redirect('reports:view_service_report', report_id=report.id)
+            job = enqueue_report('service', params, request.user)
+            messages.success(request, "Service report queued.")
+            return redirect('reports:job_status', job_id=job.id)
             
         except Exception as e:
             messages.error(request, f"Error generating report: {str(e)}")
@@ -222,26 +157,15 @@ def generate_performance_report_view(request):
     
     if request.method == 'POST':
         try:
-            target_type = request.POST.get('target_type')
-            period_start = request.POST.get('period_start')
-            period_end = request.POST.get('period_end')
-            
-            period_start_parsed = datetime.strptime(period_start, '%Y-%m-%d').date()
-            period_end_parsed = datetime.strptime(period_end, '%Y-%m-%d').date()
-            
-            # For demo purposes, create a simple performance report
-            report = PerformanceReport.objects.create(
-                target_type=target_type,
-                target_user=request.user,  # In real app, this would be the target user
-                period_start=period_start_parsed,
-                period_end=period_end_parsed,
-                kpi_metrics={'demo': 'data'},
-                targets_achieved={'demo': 'results'},
-                generated_by=request.user
-            )
+            params = {
+                'target_type': request.POST.get('target_type'),
+                'period_start': _parse_date(request.POST.get('period_start')),
+                'period_end': _parse_date(request.POST.get('period_end')),
+            }
             
-            messages.success(request, "Performance report generated successfully.")
-            return redirect('reports:view_performance_report', report_id=report.id)
+            job = enqueue_report('performance', params, request.user)
+            messages.success(request, "Performance report queued.")
+            return redirect('reports:job_status', job_id=job.id)
             
         except Exception as e:
             messages.error(request, f"Error generating report: {str(e)}")
@@ -263,3 +187,54 @@ def view_performance_report_view(request, report_id):
     }
     
     return render(request, 'reports/view_performance_report.html', context)
+
+def _job_for(request, job_id):
+    """The job if the user requested it or is an admin, else None"""
+    job = get_object_or_404(ReportJob, id=job_id)
+    if request.user.user_type != 'admin' and job.requested_by_id != request.user.id:
+        return None
+    return job
+
+def _job_state(job):
+    state = {
+        'id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+        'report_url': None,
+    }
+    if job.status == 'done':
+        state['report_url'] = reverse(REPORT_VIEWS[job.report_kind], kwargs={'report_id': job.report_id})
+    return state
+
+@login_required
+def job_status_view(request, job_id):
+    """Progress page for a queued report, forwarding to the report once it is built"""
+    job = _job_for(request, job_id)
+    if job is None:
+        messages.error(request, "Access denied. You can only view your own reports.")
+        return redirect('dashboard:index')
+    
+    if job.status == 'done':
+        return redirect(REPORT_VIEWS[job.report_kind], report_id=job.report_id)
+    
+    context = {
+        'job': job,
+    }
+    
+    return render(request, 'reports/job_status.html', context)
+
+@login_required
+def job_status_api(request, job_id):
+    """JSON status of a report job for polling"""
+    job = _job_for(request, job_id)
+    if job is None:
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    return JsonResponse(_job_state(job))
+
+@login_required
+def job_list_api(request):
+    """JSON status of the user's recent report jobs"""
+    jobs = ReportJob.objects.filter(requested_by=request.user)[:JOB_LIST_SIZE]
+    return JsonResponse({'jobs': [dict(_job_state(job), report_kind=job.report_kind) for job in jobs]})
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from inventory.models import WarehouseItem
+from .models import Cart, CartLine
+
+
+def get_cart_count_cache_ttl():
+    """Seconds a cached cart line count lives, bounding staleness in workers that did not see the change"""
+    return getattr(settings, 'CART_COUNT_CACHE_TTL', 60)
+
+
+def _line_count_cache_key(customer):
+    return f"cart:{customer.pk}:line_count"
+
+
+def _invalidate_line_count(customer):
+    cache.delete(_line_count_cache_key(customer))
+
+
+def get_cart_lines(customer, hydrate=True):
+    """
+    Return the customer's CartLines.
+
+    With ``hydrate`` the products are loaded with a single in_bulk() query
+    and attached to the lines, instead of one lookup per line.
+    """
+    lines = list(CartLine.objects.filter(cart__customer=customer))
+    if hydrate and lines:
+        products = WarehouseItem.objects.in_bulk([line.product_id for line in lines])
+        lines = [line for line in lines if line.product_id in products]
+        for line in lines:
+            line.product = products[line.product_id]
+    return lines
+
+
+def add_to_cart(customer, product, quantity):
+    """Add ``quantity`` of ``product`` to the cart, writing only the affected line"""
+    cart, _ = Cart.objects.get_or_create(customer=customer)
+    updated = CartLine.objects.filter(cart=cart, product=product).update(quantity=F('quantity') + quantity)
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            CartLine.objects.create(cart=cart, product=product, quantity=quantity, unit_price=product.unit_price)
+    except IntegrityError:
+        # Another request created the line first; add to it instead
+        CartLine.objects.filter(cart=cart, product=product).update(quantity=F('quantity') + quantity)
+    _invalidate_line_count(customer)
+
+
+def remove_from_cart(customer, product_id):
+    """Delete one product line from the cart; returns False if it was not there"""
+    deleted, _ = CartLine.objects.filter(cart__customer=customer, product_id=product_id).delete()
+    if deleted:
+        _invalidate_line_count(customer)
+    return bool(deleted)
+
+
+def clear_cart(customer):
+    """Remove every line from the cart"""
+    CartLine.objects.filter(cart__customer=customer).delete()
+    _invalidate_line_count(customer)
+
+
+def cart_quantity(customer):
+    """Total number of units in the cart"""
+    return CartLine.objects.filter(cart__customer=customer).aggregate(total=Sum('quantity'))['total'] or 0
+
+
+def cart_line_count(customer):
+    """Number of lines in the cart, served from the cache when possible"""
+    key = _line_count_cache_key(customer)
+    count = cache.get(key)
+    if count is None:
+        count = CartLine.objects.filter(cart__customer=customer).count()
+        cache.set(key, count, get_cart_count_cache_ttl())
+    return count
@@ -0,0 +1,22 @@
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+
+
+def period_bounds(period_start, period_end):
+    """
+    Aware [start, end) datetimes covering the dates period_start..period_end.
+
+    Filtering created_at against these bounds keeps the column bare, so the
+    database can use an index, unlike created_at__date__range.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(period_start, time.min), tz)
+    end = timezone.make_aware(datetime.combine(period_end + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD string, passing date objects through"""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    return value
@@ -0,0 +1,135 @@
+import csv
+import json
+from django.http import StreamingHttpResponse
+from .dates import period_bounds
+from .models import Sale, CustomerOrder, DealerPayout
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line straight back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, fields, batch_size):
+    """
+    Yield value tuples for ``fields`` in primary-key order.
+
+    Rows are read in keyset batches rather than with one long-running cursor.
+    MySQL drivers buffer a whole result set on the client, so this keeps
+    memory flat on every backend.
+    """
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', *fields)[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1][0]
+        for row in batch:
+            yield row[1:]
+
+
+def _csv_lines(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), default=str) + '\n'
+
+
+def export_response(queryset, columns, filename, export_format='csv', batch_size=2000):
+    """
+    Stream ``queryset`` as CSV or NDJSON.
+
+    ``columns`` is a list of (header, field lookup) pairs. Only those values
+    are selected, so no model instances are built.
+    """
+    header = [name for name, _ in columns]
+    rows = _rows(queryset, [field for _, field in columns], batch_size)
+    lines = _ndjson_lines(header, rows) if export_format == 'ndjson' else _csv_lines(header, rows)
+
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+SALE_COLUMNS = [
+    ('id', 'id'),
+    ('created_at', 'created_at'),
+    ('dealer', 'dealer__username'),
+    ('customer_name', 'customer_name'),
+    ('customer_phone', 'customer_phone'),
+    ('customer_email', 'customer_email'),
+    ('status', 'status'),
+    ('total_amount', 'total_amount'),
+]
+
+ORDER_COLUMNS = [
+    ('order_number', 'order_number'),
+    ('created_at', 'created_at'),
+    ('customer', 'customer__username'),
+    ('dealer', 'dealer__username'),
+    ('status', 'status'),
+    ('payment_status', 'payment_status'),
+    ('total_amount', 'total_amount'),
+    ('approved_at', 'approved_at'),
+    ('delivered_at', 'delivered_at'),
+]
+
+PAYOUT_COLUMNS = [
+    ('dealer', 'dealer__username'),
+    ('period_start', 'period_start'),
+    ('period_end', 'period_end'),
+    ('total_sales', 'total_sales'),
+    ('commission_rate', 'commission_rate'),
+    ('commission_amount', 'commission_amount'),
+    ('payout_amount', 'payout_amount'),
+    ('status', 'status'),
+    ('calculated_at', 'calculated_at'),
+]
+
+
+def _in_period(queryset, start_date, end_date):
+    if start_date and end_date:
+        low, high = period_bounds(start_date, end_date)
+        queryset = queryset.filter(created_at__gte=low, created_at__lt=high)
+    return queryset
+
+
+def sales_for_export(start_date=None, end_date=None, dealer_id=None, status=None):
+    sales = _in_period(Sale.objects.all(), start_date, end_date)
+    if dealer_id:
+        sales = sales.filter(dealer_id=dealer_id)
+    if status:
+        sales = sales.filter(status=status)
+    return sales
+
+
+def orders_for_export(start_date=None, end_date=None, dealer_id=None, status=None):
+    orders = _in_period(CustomerOrder.objects.all(), start_date, end_date)
+    if dealer_id:
+        orders = orders.filter(dealer_id=dealer_id)
+    if status:
+        orders = orders.filter(status=status)
+    return orders
+
+
+def payouts_for_export(start_date=None, end_date=None, dealer_id=None, status=None):
+    payouts = DealerPayout.objects.all()
+    if start_date and end_date:
+        payouts = payouts.filter(period_start__gte=start_date, period_end__lte=end_date)
+    if dealer_id:
+        payouts = payouts.filter(dealer_id=dealer_id)
+    if status:
+        payouts = payouts.filter(status=status)
+    return payouts
@@ -0,0 +1,57 @@
+import glob
+import hashlib
+import os
+from pathlib import Path
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.text import get_valid_filename
+
+# Pool workers import this module before Django is set up, so it must not import models
+INVOICE_DOCUMENT_DIR = 'invoices'
+# Invoice fields the document prints that can change after it is first rendered
+VERSIONED_FIELDS = ('status', 'due_date', 'tax_amount', 'discount_amount', 'grand_total')
+
+
+def invoice_document_version(invoice_fields):
+    """Digest of the versioned fields of an invoice, given as a mapping"""
+    return hashlib.md5(repr([str(invoice_fields[field]) for field in VERSIONED_FIELDS]).encode()).hexdigest()
+
+
+def invoice_document_name(invoice_number):
+    """File name for an invoice's document, e.g. inside a ZIP archive"""
+    return f"{get_valid_filename(invoice_number)}.html"
+
+
+def invoice_document_path(invoice_number, version):
+    """
+    Where the rendered document for one version of an invoice is cached under MEDIA_ROOT.
+
+    The version is part of the file name, so a paid or edited invoice gets a
+    new document instead of the cached one.
+    """
+    return Path(settings.MEDIA_ROOT) / INVOICE_DOCUMENT_DIR / f"{get_valid_filename(invoice_number)}.{version}.html"
+
+
+def init_worker():
+    # Spawned workers start without Django configured
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def render_invoice_document(payload):
+    """Render one invoice payload to its cache file; runs inside pool workers, so it must not touch the DB"""
+    invoice_number = payload['invoice']['invoice_number']
+    path = invoice_document_path(invoice_number, invoice_document_version(payload['invoice']))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    html = render_to_string('sales/invoice_document.html', payload)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(html, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+    # Earlier versions of this invoice's document are never served again
+    for stale in path.parent.glob(f"{glob.escape(get_valid_filename(invoice_number))}.*.html"):
+        if stale != path and len(stale.name) == len(path.name):
+            stale.unlink(missing_ok=True)
+    return str(path)
@@ -0,0 +1,203 @@
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from django.utils import timezone
+from .dates import period_bounds
+from .invoice_documents import (
+    VERSIONED_FIELDS, init_worker, invoice_document_name, invoice_document_path, invoice_document_version,
+    render_invoice_document
+)
+from .models import Sale, SaleItem, Invoice
+from .numbering import next_numbers
+
+CENT = Decimal('0.01')
+
+
+def _document_payloads(invoices):
+    """Plain, picklable render inputs for a batch of invoices (one query for all their items)"""
+    items = {}
+    for row in SaleItem.objects.filter(sale_id__in=[invoice.sale_id for invoice in invoices]).values(
+        'sale_id', 'item__name', 'item__sku', 'quantity', 'unit_price', 'total_price'
+    ):
+        items.setdefault(row['sale_id'], []).append({
+            'name': row['item__name'],
+            'sku': row['item__sku'],
+            'quantity': row['quantity'],
+            'unit_price': row['unit_price'],
+            'total_price': row['total_price'],
+        })
+
+    payloads = []
+    for invoice in invoices:
+        sale = invoice.sale
+        payloads.append({
+            'invoice': {
+                'invoice_number': invoice.invoice_number,
+                'issued_date': invoice.issued_date,
+                'due_date': invoice.due_date,
+                'tax_amount': invoice.tax_amount,
+                'discount_amount': invoice.discount_amount,
+                'grand_total': invoice.grand_total,
+                'status': invoice.status,
+            },
+            'sale': {
+                'id': sale.id,
+                'dealer': sale.dealer.username,
+                'customer_name': sale.customer_name,
+                'customer_phone': sale.customer_phone,
+                'customer_email': sale.customer_email,
+                'total_amount': sale.total_amount,
+            },
+            'items': items.get(sale.id, []),
+        })
+    return payloads
+
+
+def _document_path(invoice):
+    """Cached document path for the invoice's current status and amounts"""
+    version = invoice_document_version({field: getattr(invoice, field) for field in VERSIONED_FIELDS})
+    return invoice_document_path(invoice.invoice_number, version)
+
+
+def ensure_rendered(invoices, executor=None):
+    """
+    Make sure every invoice in the batch has a cached document of its current version.
+
+    Only invoices without a cached file for their current status and amounts
+    are rendered, in ``executor`` when given. Returns {invoice_number: Path}.
+    """
+    paths = {invoice.invoice_number: _document_path(invoice) for invoice in invoices}
+    missing = [invoice for invoice in invoices if not paths[invoice.invoice_number].exists()]
+    if missing:
+        payloads = _document_payloads(missing)
+        if executor is not None:
+            list(executor.map(render_invoice_document, payloads, chunksize=16))
+        else:
+            for payload in payloads:
+                render_invoice_document(payload)
+    return paths
+
+
+def _batches(queryset, batch_size):
+    """Yield lists of rows in primary-key order without holding a cursor open between batches"""
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        yield batch
+
+
+def period_invoices(start_date, end_date, dealer=None):
+    """Invoices for completed sales made between start_date and end_date"""
+    low, high = period_bounds(start_date, end_date)
+    invoices = Invoice.objects.filter(
+        sale__status='completed',
+        sale__created_at__gte=low,
+        sale__created_at__lt=high
+    ).select_related('sale__dealer')
+    if dealer:
+        invoices = invoices.filter(sale__dealer=dealer)
+    return invoices
+
+
+def create_missing_invoices(start_date, end_date, dealer=None, tax_percentage=0, due_days=30, batch_size=500):
+    """Bulk-create invoices for completed sales in the period that have none; returns how many were created"""
+    low, high = period_bounds(start_date, end_date)
+    sales = Sale.objects.filter(
+        status='completed',
+        created_at__gte=low,
+        created_at__lt=high,
+        invoice__isnull=True
+    )
+    if dealer:
+        sales = sales.filter(dealer=dealer)
+
+    tax_percentage = Decimal(str(tax_percentage))
+    due_date = timezone.now() + timedelta(days=due_days)
+    created = 0
+    last_pk = 0
+    while True:
+        batch = list(sales.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'total_amount')[:batch_size])
+        if not batch:
+            return created
+        last_pk = batch[-1][0]
+
+        invoices = []
+        invoice_numbers = next_numbers('invoice', len(batch))
+        for (sale_id, subtotal), invoice_number in zip(batch, invoice_numbers):
+            tax_amount = (subtotal * tax_percentage / 100).quantize(CENT, ROUND_HALF_UP)
+            invoices.append(Invoice(
+                sale_id=sale_id,
+                invoice_number=invoice_number,
+                due_date=due_date,
+                tax_amount=tax_amount,
+                grand_total=subtotal + tax_amount
+            ))
+        # A concurrent run may have invoiced some of these sales already; its
+        # rows are skipped, so count only those carrying this batch's numbers
+        Invoice.objects.bulk_create(invoices, ignore_conflicts=True)
+        created += Invoice.objects.filter(invoice_number__in=invoice_numbers).count()
+
+
+def generate_invoices(start_date, end_date, dealer=None, tax_percentage=0, batch_size=500, workers=None, progress=None):
+    """
+    Invoice every completed sale in the period and render all of their documents.
+
+    Missing invoices are created in batches. Documents that are not cached yet
+    are then rendered in a process pool of ``workers`` processes. Returns
+    (invoices_created, invoices_in_period). ``progress`` is called as
+    progress(done) after each rendered batch.
+    """
+    created = create_missing_invoices(start_date, end_date, dealer, tax_percentage, batch_size=batch_size)
+
+    invoices = period_invoices(start_date, end_date, dealer)
+    done = 0
+    # Spawned rather than forked so workers never share the parent's database connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=init_worker) as executor:
+        for batch in _batches(invoices, batch_size):
+            ensure_rendered(batch, executor)
+            done += len(batch)
+            if progress:
+                progress(done)
+    return created, done
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only buffer that ZipFile writes into and the response drains"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def stream_invoice_zip(invoices, batch_size=200):
+    """
+    Yield a ZIP archive of the invoices' documents chunk by chunk.
+
+    Invoices are read in primary-key batches and rendered on demand, and
+    each file is drained as soon as it is compressed. Memory stays bounded by
+    one batch no matter how many invoices the period holds.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for batch in _batches(invoices, batch_size):
+            for invoice_number, path in ensure_rendered(batch).items():
+                archive.write(path, arcname=invoice_document_name(invoice_number))
+                yield sink.drain()
+    yield sink.drain()
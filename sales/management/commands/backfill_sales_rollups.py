@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from sales.dates import parse_date
+from sales.rollups import backfill_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollups from existing sales"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD), defaults to the first sale')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD), defaults to the latest sale')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = parse_date(options['start'])
+            end_date = parse_date(options['end'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        def progress(chunk_start, chunk_end):
+            self.stdout.write(f"  rebuilt {chunk_start} to {chunk_end}")
+
+        written = backfill_rollups(start_date, end_date, chunk_days=options['chunk_days'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} dealer-day rollup row(s)"))
@@ -0,0 +1,49 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from accounts.models import User
+from inventory.models import DealerStock, WarehouseItem
+from sales.sale_builder import build_sale
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark build_sale() and show that its query count does not grow with the number of lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,10,40,100', help='Comma separated cart sizes to benchmark')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+
+        self.stdout.write(f"{'lines':>6} {'queries':>8} {'ms':>9}")
+        try:
+            # Everything below is created inside one transaction and rolled back
+            with transaction.atomic():
+                dealer = User.objects.create_user(username='bench-sale-dealer', user_type='dealer')
+                WarehouseItem.objects.bulk_create([
+                    WarehouseItem(name=f'Bench part {i}', category='parts', sku=f'BENCH-SALE-{i}', quantity=1000, unit_price=10)
+                    for i in range(max(sizes))
+                ])
+                # Re-read so primary keys are populated on backends without RETURNING
+                items = list(WarehouseItem.objects.filter(sku__startswith='BENCH-SALE-').order_by('pk'))
+                DealerStock.objects.bulk_create([
+                    DealerStock(dealer=dealer, item=item, quantity=1000, selling_price=12)
+                    for item in items
+                ])
+
+                for size in sizes:
+                    lines = [{'item_id': item.id, 'quantity': 1} for item in items[:size]]
+                    with CaptureQueriesContext(connection) as ctx:
+                        started = perf_counter()
+                        build_sale(dealer, 'Bench Customer', '0000000000', lines, created_by=dealer)
+                        elapsed = (perf_counter() - started) * 1000
+                    self.stdout.write(f'{size:>6} {len(ctx.captured_queries):>8} {elapsed:>9.2f}')
+
+                raise _Rollback
+        except _Rollback:
+            pass
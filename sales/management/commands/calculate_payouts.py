@@ -0,0 +1,34 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from sales.payouts import calculate_payouts
+
+
+class Command(BaseCommand):
+    help = "Calculate dealer payouts for a period; safe to re-run"
+
+    def add_arguments(self, parser):
+        parser.add_argument('period_start', help='First day of the period (YYYY-MM-DD)')
+        parser.add_argument('period_end', help='Last day of the period (YYYY-MM-DD)')
+        parser.add_argument('--commission-rate', type=float, default=5.0, help='Commission percentage (default 5)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            period_start = datetime.strptime(options['period_start'], '%Y-%m-%d').date()
+            period_end = datetime.strptime(options['period_end'], '%Y-%m-%d').date()
+        except ValueError as e:
+            raise CommandError(str(e))
+        if period_end < period_start:
+            raise CommandError("period_end must not be before period_start")
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} payouts written")
+
+        written = calculate_payouts(
+            period_start,
+            period_end,
+            options['commission_rate'],
+            batch_size=options['batch_size'],
+            progress=progress
+        )
+        self.stdout.write(self.style.SUCCESS(f"Calculated {written} payout(s) for {period_start} to {period_end}"))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from sales.dates import parse_date
+from sales.invoicing import generate_invoices
+
+
+class Command(BaseCommand):
+    help = "Create missing invoices for completed sales in a period and render their documents"
+
+    def add_arguments(self, parser):
+        parser.add_argument('start_date', help='First day of the period (YYYY-MM-DD)')
+        parser.add_argument('end_date', help='Last day of the period (YYYY-MM-DD)')
+        parser.add_argument('--dealer', help='Only invoice sales of this dealer (username)')
+        parser.add_argument('--tax-percentage', type=float, default=0)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=None, help='Render processes (default: CPU count)')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = parse_date(options['start_date'])
+            end_date = parse_date(options['end_date'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        dealer = None
+        if options['dealer']:
+            dealer = User.objects.filter(username=options['dealer'], user_type='dealer').first()
+            if dealer is None:
+                raise CommandError(f"Dealer '{options['dealer']}' not found")
+
+        def progress(done):
+            self.stdout.write(f"  {done} invoice document(s) ready")
+
+        created, total = generate_invoices(
+            start_date,
+            end_date,
+            dealer=dealer,
+            tax_percentage=options['tax_percentage'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            progress=progress
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {created} invoice(s); {total} invoice document(s) ready"))
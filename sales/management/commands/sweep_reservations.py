@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from sales.reservations import sweep_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Release checkout stock holds whose TTL has passed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping instead of running once')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between sweeps when looping')
+
+    def handle(self, *args, **options):
+        while True:
+            removed = sweep_expired_reservations()
+            self.stdout.write(f"Released {removed} expired reservation(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0004_cart_cartline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customerorder',
+            index=models.Index(fields=['dealer', 'status', 'created_at'], name='sales_custo_dealer__94d1b2_idx'),
+        ),
+    ]
@@ -35,15 +35,22 @@ class CustomerOrder(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['dealer', 'status', 'created_at']),
+        ]
     
     def __str__(self):
         return f"Order {self.order_number} - {self.customer.username}"
     
+    @staticmethod
+    def generate_order_number():
+        from .numbering import next_number
+        return next_number('order')
+    
     def save(self, *args, **kwargs):
         if not self.order_number:
             # Generate order number
-            import uuid
-            self.order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
+            self.order_number = self.generate_order_number()
         super().save(*args, **kwargs)
     
     @property
@@ -74,16 +81,73 @@ class Receipt(models.Model):
     payment_method = models.CharField(max_length=20, default='cod')
     issued_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
+    @staticmethod
+    def generate_receipt_number():
+        from .numbering import next_number
+        return next_number('receipt')
+    
     def save(self, *args, **kwargs):
         if not self.receipt_number:
             # Generate receipt number
-            import uuid
-            self.receipt_number = f"RCPT-{uuid.uuid4().hex[:8].upper()}"
+            self.receipt_number = self.generate_receipt_number()
         super().save(*args, **kwargs)
     
     def __str__(self):
         return f"Receipt {self.receipt_number} for {self.order.order_number}"
 
+class Cart(models.Model):
+    """Server-side shopping cart, one per customer"""
+    customer = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Cart for {self.customer.username}"
+
+class CartLine(models.Model):
+    """A single product line in a customer's cart"""
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='lines')
+    product = models.ForeignKey(WarehouseItem, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)  # Price when first added
+    added_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['cart', 'product']
+        ordering = ['added_at']
+    
+    def __str__(self):
+        return f"{self.product.name} x {self.quantity}"
+    
+    @property
+    def total_price(self):
+        return self.quantity * self.unit_price
+
+class StockReservation(models.Model):
+    """Time-limited hold on warehouse stock placed when a customer starts checkout"""
+    STATUS_CHOICES = (
+        ('held', 'Held'),
+        ('committed', 'Committed'),
+    )
+    
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(WarehouseItem, on_delete=models.CASCADE, related_name='reservations')
+    order = models.ForeignKey(CustomerOrder, on_delete=models.CASCADE, null=True, blank=True, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    expires_at = models.DateTimeField(null=True, blank=True)  # Only set while status is 'held'
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'status', 'expires_at']),
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product.name} x {self.quantity} for {self.customer.username} ({self.status})"
+
 # Existing models remain unchanged...
 
 class Sale(models.Model):
@@ -124,6 +188,41 @@ class SaleItem(models.Model):
     def __str__(self):
         return f"{self.item.name} x {self.quantity}"
 
+class DailyDealerSales(models.Model):
+    """Completed-sale totals per dealer per day, kept up to date as sales complete"""
+    day = models.DateField()
+    dealer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_sales')
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['day', 'dealer']
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['dealer', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.dealer.username} on {self.day}: {self.total_sales} ({self.transaction_count})"
+
+class DailyItemSales(models.Model):
+    """Completed-sale quantities and revenue per dealer, item and day"""
+    day = models.DateField()
+    dealer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_item_sales')
+    item = models.ForeignKey(WarehouseItem, on_delete=models.CASCADE, related_name='daily_sales')
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        unique_together = ['day', 'dealer', 'item']
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['dealer', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.item.name} by {self.dealer.username} on {self.day}: {self.quantity}"
+
 class Invoice(models.Model):
     sale = models.OneToOneField(Sale, on_delete=models.CASCADE, related_name='invoice')
     invoice_number = models.CharField(max_length=50, unique=True)
@@ -139,6 +238,11 @@ class Invoice(models.Model):
     
     def __str__(self):
         return f"Invoice {self.invoice_number} for Sale #{self.sale.id}"
+    
+    @staticmethod
+    def generate_invoice_number():
+        from .numbering import next_number
+        return next_number('invoice')
 
 class DealerPayout(models.Model):
     dealer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payouts')
@@ -155,11 +259,24 @@ class DealerPayout(models.Model):
         ordering = ['-period_end']
         unique_together = ['dealer', 'period_start', 'period_end']
     
+    @staticmethod
+    def compute_amounts(total_sales, commission_rate):
+        """Return (commission_amount, payout_amount) for the given sales total and rate"""
+        commission_amount = (total_sales * commission_rate) / 100
+        return commission_amount, total_sales - commission_amount
+    
     def calculate_payout(self):
         """Calculate commission and payout amount"""
-        self.commission_amount = (self.total_sales * self.commission_rate) / 100
-        self.payout_amount = self.total_sales - self.commission_amount
+        self.commission_amount, self.payout_amount = self.compute_amounts(self.total_sales, self.commission_rate)
         self.save()
     
     def __str__(self):
         return f"Payout for {self.dealer.username}: {self.period_start} to {self.period_end}"
+
+class DocumentSequence(models.Model):
+    """Counter behind the order, receipt and invoice numbers; see sales.numbering"""
+    name = models.CharField(max_length=20, unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+    
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
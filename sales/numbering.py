@@ -0,0 +1,88 @@
+import os
+import threading
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import DocumentSequence
+
+DOCUMENT_PREFIXES = {
+    'order': 'ORD',
+    'receipt': 'RCPT',
+    'invoice': 'INV',
+}
+NUMBER_WIDTH = 10
+
+# name -> list of [start, end) ranges this process has reserved and not handed out yet
+_blocks = {}
+_lock = threading.Lock()
+
+# A forked worker must not hand out the numbers its parent already holds
+os.register_at_fork(after_in_child=_blocks.clear)
+
+
+def get_block_size():
+    """How many numbers a process reserves per round trip"""
+    return getattr(settings, 'DOCUMENT_NUMBER_BLOCK_SIZE', 50)
+
+
+def format_number(name, value):
+    return f"{DOCUMENT_PREFIXES[name]}-{value:0{NUMBER_WIDTH}d}"
+
+
+def _reserve(name, size):
+    """Advance the ``name`` sequence by ``size``; returns the first value of the reserved range"""
+    sequence = DocumentSequence.objects.filter(name=name)
+    with transaction.atomic():
+        if not sequence.update(next_value=F('next_value') + size):
+            try:
+                with transaction.atomic():
+                    DocumentSequence.objects.create(name=name, next_value=1 + size)
+                return 1
+            except IntegrityError:
+                # Another process created the sequence first
+                sequence.update(next_value=F('next_value') + size)
+        return sequence.values_list('next_value', flat=True).get() - size
+
+
+def _release(name, start, end):
+    with _lock:
+        _blocks.setdefault(name, []).append([start, end])
+
+
+def next_numbers(name, count):
+    """
+    Allocate ``count`` unique, prefix-formatted numbers for ``name`` documents.
+
+    Numbers come from blocks this process has reserved in DocumentSequence,
+    so the database is only hit once per block. Numbers increase within a
+    process but may interleave between processes. Spare numbers of a new
+    block become usable only once the reserving transaction commits. If it
+    rolls back, the sequence row rolls back with it and the block is
+    discarded, so no number can be handed out twice.
+    """
+    values = []
+    with _lock:
+        ranges = _blocks.setdefault(name, [])
+        while ranges and len(values) < count:
+            start, end = ranges[0]
+            take = min(end - start, count - len(values))
+            values.extend(range(start, start + take))
+            if start + take == end:
+                ranges.pop(0)
+            else:
+                ranges[0][0] = start + take
+
+    missing = count - len(values)
+    if missing:
+        size = max(missing, get_block_size())
+        start = _reserve(name, size)
+        values.extend(range(start, start + missing))
+        if missing < size:
+            spare_start, spare_end = start + missing, start + size
+            transaction.on_commit(lambda: _release(name, spare_start, spare_end))
+
+    return [format_number(name, value) for value in values]
+
+
+def next_number(name):
+    return next_numbers(name, 1)[0]
@@ -0,0 +1,147 @@
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from inventory.catalog_cache import invalidate_catalog
+from inventory.models import StockMovement, WarehouseItem
+from inventory.movements import record_movements
+from .models import CustomerOrder, OrderItem, Receipt
+from .numbering import next_numbers
+from .reservations import release_order_reservations
+
+
+class OrderApprovalError(Exception):
+    """Raised when an order cannot be approved"""
+
+
+def _per_product(quantities):
+    """CASE expression mapping each product pk to the quantity it loses"""
+    return Case(
+        *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def _deduct_warehouse_stock(quantities):
+    """
+    Decrement warehouse stock for {product_id: quantity} with one conditional UPDATE.
+
+    A row is only touched if it still holds enough stock, so comparing the
+    affected row count with the number of products detects any shortfall
+    without a read-modify-write race.
+    """
+    if not quantities:
+        return
+    per_product = _per_product(quantities)
+    updated = WarehouseItem.objects.filter(
+        pk__in=quantities.keys(),
+        quantity__gte=per_product
+    ).update(
+        quantity=F('quantity') - per_product,
+        updated_at=timezone.now()
+    )
+    if updated != len(quantities):
+        raise OrderApprovalError("Insufficient warehouse stock to approve the order")
+
+
+def approve_orders(order_ids, dealer):
+    """
+    Approve the dealer's pending orders in bulk and return (approved_orders, failures).
+
+    Orders and the products they need are locked up front. Orders are then
+    allocated oldest first against the locked quantities; an order that does
+    not fit is skipped whole and reported in ``failures`` ({order_id: reason}).
+    The stock deduction, the ledger entries, the status change, the receipts
+    and the release of checkout holds are each a single statement, so the
+    query count does not grow with the number of orders.
+    """
+    order_ids = set(order_ids)
+    failures = {}
+
+    with transaction.atomic():
+        orders = list(CustomerOrder.objects.select_for_update().filter(
+            pk__in=order_ids,
+            dealer=dealer,
+            status='pending'
+        ).order_by('created_at', 'pk'))
+        for order_id in order_ids - {order.pk for order in orders}:
+            failures[order_id] = "Order not found or not pending"
+
+        items_by_order = {}
+        for order_id, product_id, quantity in OrderItem.objects.filter(order__in=orders).values_list('order_id', 'product_id', 'quantity'):
+            needed = items_by_order.setdefault(order_id, {})
+            needed[product_id] = needed.get(product_id, 0) + quantity
+
+        product_ids = {product_id for needed in items_by_order.values() for product_id in needed}
+        locked = WarehouseItem.objects.select_for_update().filter(
+            pk__in=product_ids
+        ).order_by('pk').values_list('pk', 'quantity', 'category')
+        stock, categories = {}, {}
+        for product_id, quantity, category in locked:
+            stock[product_id] = quantity
+            categories[product_id] = category
+
+        approved = []
+        deductions = {}
+        for order in orders:
+            needed = items_by_order.get(order.pk, {})
+            short = [product_id for product_id, quantity in needed.items() if stock.get(product_id, 0) < quantity]
+            if short:
+                failures[order.pk] = "Insufficient warehouse stock"
+                continue
+            for product_id, quantity in needed.items():
+                stock[product_id] -= quantity
+                deductions[product_id] = deductions.get(product_id, 0) + quantity
+            approved.append(order)
+
+        if not approved:
+            return [], failures
+
+        _deduct_warehouse_stock(deductions)
+        # update() bypasses the WarehouseItem signals that expire the catalog cache
+        invalidate_catalog(*{categories[product_id] for product_id in deductions})
+        record_movements([
+            StockMovement(
+                item_id=product_id,
+                movement_type='order',
+                quantity_change=-quantity,
+                reference=order.order_number,
+                created_by=dealer
+            )
+            for order in approved
+            for product_id, quantity in items_by_order.get(order.pk, {}).items()
+        ])
+
+        now = timezone.now()
+        CustomerOrder.objects.filter(pk__in=[order.pk for order in approved]).update(
+            status='approved',
+            approved_at=now,
+            updated_at=now
+        )
+        receipt_numbers = next_numbers('receipt', len(approved))
+        Receipt.objects.bulk_create([
+            Receipt(
+                order=order,
+                receipt_number=receipt_number,
+                amount_paid=order.total_amount,
+                payment_method='cod',
+                issued_by=dealer
+            )
+            for order, receipt_number in zip(approved, receipt_numbers)
+        ], batch_size=500)
+
+        # The stock is now deducted, so the checkout holds are no longer needed
+        release_order_reservations(approved)
+
+    for order in approved:
+        order.status = 'approved'
+        order.approved_at = now
+    return approved, failures
+
+
+def approve_order(order, dealer):
+    """Approve a single order, raising OrderApprovalError if it cannot be fully fulfilled"""
+    approved, failures = approve_orders([order.pk], dealer)
+    if not approved:
+        raise OrderApprovalError(failures.get(order.pk, "Order could not be approved"))
+    return approved[0]
@@ -0,0 +1,41 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+
+def encode_cursor(value, pk):
+    """Opaque cursor pointing just past the row with (value, pk)"""
+    raw = f"{value.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(); raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(value), int(pk)
+    except (TypeError, UnicodeDecodeError, base64.binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_page(queryset, cursor=None, limit=25, field='created_at'):
+    """
+    Return (rows, next_cursor) for the newest-first page after ``cursor``.
+
+    Rows are ordered by (field, pk) descending and the cursor becomes a
+    WHERE clause on those columns, so every page is an index range scan no
+    matter how deep the dealer has scrolled, unlike OFFSET pagination.
+    """
+    queryset = queryset.order_by(f'-{field}', '-pk')
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
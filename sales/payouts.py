@@ -0,0 +1,66 @@
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import transaction
+from django.db.models import Sum
+from common.upserts import upsert
+from .dates import period_bounds
+from .models import Sale, DealerPayout
+
+CENT = Decimal('0.01')
+
+
+def calculate_payouts(period_start, period_end, commission_rate, batch_size=500, progress=None):
+    """
+    Calculate DealerPayouts for every dealer with completed sales in the period.
+
+    Dealer totals come from one grouped query and the payouts are upserted
+    in batches, so the cost no longer grows by several queries per dealer.
+    Re-running for the same period is idempotent. Calculated rows are
+    updated, rows for dealers whose sales have disappeared are removed, and
+    payouts already marked paid are left untouched. ``progress`` is called as
+    progress(done, total) after each batch. Returns the number of payouts
+    written.
+    """
+    commission_rate = Decimal(str(commission_rate))
+    start, end = period_bounds(period_start, period_end)
+
+    totals = Sale.objects.filter(
+        status='completed',
+        created_at__gte=start,
+        created_at__lt=end
+    ).values('dealer').annotate(total=Sum('total_amount')).filter(total__gt=0).order_by().values_list('dealer', 'total')
+
+    with transaction.atomic():
+        existing = DealerPayout.objects.filter(period_start=period_start, period_end=period_end)
+        paid_dealers = set(existing.filter(status='paid').values_list('dealer_id', flat=True))
+
+        payouts = []
+        for dealer_id, total_sales in totals:
+            if dealer_id in paid_dealers:
+                continue
+            commission_amount, payout_amount = DealerPayout.compute_amounts(total_sales, commission_rate)
+            payouts.append(DealerPayout(
+                dealer_id=dealer_id,
+                period_start=period_start,
+                period_end=period_end,
+                total_sales=total_sales,
+                commission_rate=commission_rate,
+                commission_amount=commission_amount.quantize(CENT, ROUND_HALF_UP),
+                payout_amount=payout_amount.quantize(CENT, ROUND_HALF_UP),
+                status='calculated'
+            ))
+
+        existing.filter(status='calculated').exclude(
+            dealer_id__in=[payout.dealer_id for payout in payouts]
+        ).delete()
+
+        for offset in range(0, len(payouts), batch_size):
+            upsert(
+                DealerPayout,
+                payouts[offset:offset + batch_size],
+                unique_fields=['dealer', 'period_start', 'period_end'],
+                update_fields=['total_sales', 'commission_rate', 'commission_amount', 'payout_amount']
+            )
+            if progress:
+                progress(min(offset + batch_size, len(payouts)), len(payouts))
+
+    return len(payouts)
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from inventory.models import WarehouseItem
+from .models import StockReservation
+
+
+class ReservationError(Exception):
+    """Raised when stock for a checkout cannot be held"""
+
+
+def get_reservation_ttl():
+    """How long a checkout hold lives before the sweeper may release it"""
+    return timedelta(seconds=getattr(settings, 'STOCK_RESERVATION_TTL', 15 * 60))
+
+
+def active_holds(now=None):
+    """Reservations that currently count against warehouse stock"""
+    now = now or timezone.now()
+    return StockReservation.objects.filter(
+        Q(status='committed') | Q(status='held', expires_at__gt=now)
+    )
+
+
+def with_available_to_sell(queryset, now=None):
+    """Annotate WarehouseItems with held_quantity and available_to_sell (quantity - active holds)"""
+    held = active_holds(now).filter(product=OuterRef('pk')).values('product').annotate(
+        total=Sum('quantity')
+    ).values('total')
+    return queryset.annotate(
+        held_quantity=Coalesce(Subquery(held, output_field=IntegerField()), Value(0)),
+    ).annotate(
+        available_to_sell=F('quantity') - F('held_quantity')
+    )
+
+
+def reserve_cart(customer, lines):
+    """
+    Place checkout holds for ``lines`` ({product_id: quantity}) on behalf of ``customer``.
+
+    The warehouse rows are locked in one query and the holds of other
+    customers are summed in one grouped query. The customer's previous holds
+    are then replaced with a fresh batch, so calling this again simply renews
+    the TTL. Products that no longer exist are skipped; the returned
+    {product_id: WarehouseItem} map lets the caller notice them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        products = WarehouseItem.objects.select_for_update().filter(pk__in=lines.keys()).order_by('pk')
+        products = {product.pk: product for product in products}
+
+        held_by_others = dict(
+            active_holds(now).filter(product_id__in=products.keys()).exclude(
+                customer=customer, status='held'
+            ).values('product').annotate(total=Sum('quantity')).values_list('product', 'total')
+        )
+
+        for product_id, product in products.items():
+            available = product.quantity - held_by_others.get(product_id, 0)
+            if available < lines[product_id]:
+                raise ReservationError(f"Insufficient stock for {product.name}")
+
+        StockReservation.objects.filter(customer=customer, status='held').delete()
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                customer=customer,
+                product=product,
+                quantity=lines[product_id],
+                expires_at=now + get_reservation_ttl()
+            )
+            for product_id, product in products.items()
+        ])
+
+    return products
+
+
+def commit_reservations(customer, order):
+    """Attach the customer's live holds to a placed order so they last until it is approved"""
+    return StockReservation.objects.filter(customer=customer, status='held').update(
+        status='committed',
+        order=order,
+        expires_at=None
+    )
+
+
+def release_order_reservations(orders):
+    """Drop the holds of ``orders`` once their stock has actually been deducted or they are cancelled"""
+    return StockReservation.objects.filter(order__in=orders).delete()[0]
+
+
+def sweep_expired_reservations(now=None, batch_size=1000):
+    """Delete expired checkout holds in batches and return how many were removed"""
+    now = now or timezone.now()
+    removed = 0
+    while True:
+        expired_ids = list(StockReservation.objects.filter(
+            status='held',
+            expires_at__lte=now
+        ).values_list('pk', flat=True)[:batch_size])
+        if not expired_ids:
+            return removed
+        removed += StockReservation.objects.filter(pk__in=expired_ids, status='held').delete()[0]
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Max, Min, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .dates import parse_date, period_bounds
+from .models import Sale, SaleItem, DailyDealerSales, DailyItemSales
+
+
+def _record_dealer_day(day, dealer_id, amount):
+    lookup = DailyDealerSales.objects.filter(day=day, dealer_id=dealer_id)
+    increment = {'total_sales': F('total_sales') + amount, 'transaction_count': F('transaction_count') + 1}
+    if lookup.update(**increment):
+        return
+    try:
+        with transaction.atomic():
+            DailyDealerSales.objects.create(day=day, dealer_id=dealer_id, total_sales=amount, transaction_count=1)
+    except IntegrityError:
+        # A concurrent sale created the row first
+        lookup.update(**increment)
+
+
+def _record_item_days(day, dealer_id, per_item):
+    existing = set(DailyItemSales.objects.filter(
+        day=day,
+        dealer_id=dealer_id,
+        item_id__in=per_item.keys()
+    ).values_list('item_id', flat=True))
+
+    if existing:
+        DailyItemSales.objects.filter(day=day, dealer_id=dealer_id, item_id__in=existing).update(
+            quantity=F('quantity') + Case(
+                *[When(item_id=item_id, then=Value(per_item[item_id][0])) for item_id in existing],
+                default=Value(0),
+                output_field=IntegerField()
+            ),
+            revenue=F('revenue') + Case(
+                *[When(item_id=item_id, then=Value(per_item[item_id][1])) for item_id in existing],
+                default=Value(0),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            )
+        )
+
+    DailyItemSales.objects.bulk_create([
+        DailyItemSales(day=day, dealer_id=dealer_id, item_id=item_id, quantity=quantity, revenue=revenue)
+        for item_id, (quantity, revenue) in per_item.items()
+        if item_id not in existing
+    ])
+
+
+def record_completed_sale(sale, sale_items):
+    """
+    Add a newly completed sale to the daily rollups.
+
+    Runs a constant number of queries however many lines the sale has. The
+    caller is expected to be inside a transaction.
+    """
+    day = timezone.localdate(sale.created_at)
+    _record_dealer_day(day, sale.dealer_id, sale.total_amount)
+
+    per_item = {}
+    for sale_item in sale_items:
+        quantity, revenue = per_item.get(sale_item.item_id, (0, 0))
+        per_item[sale_item.item_id] = (quantity + sale_item.quantity, revenue + sale_item.total_price)
+    if not per_item:
+        return
+
+    try:
+        with transaction.atomic():
+            _record_item_days(day, sale.dealer_id, per_item)
+    except IntegrityError:
+        # Another sale inserted one of the missing rows; they all exist now
+        _record_item_days(day, sale.dealer_id, per_item)
+
+
+def backfill_rollups(start_date=None, end_date=None, chunk_days=31, progress=None):
+    """
+    Rebuild the daily rollups from Sale/SaleItem for start_date..end_date.
+
+    Defaults to the full range of recorded sales. The range is processed in
+    chunks of ``chunk_days``, each replaced inside its own transaction with
+    two grouped queries, so memory stays bounded. Sales completing while a
+    chunk covering today is rebuilt can be missed, so re-run that chunk
+    afterwards if needed. ``progress`` is called as progress(chunk_start,
+    chunk_end). Returns the number of (dealer, day) rows written.
+    """
+    start_date, end_date = parse_date(start_date), parse_date(end_date)
+    if start_date is None or end_date is None:
+        bounds = Sale.objects.filter(status='completed').aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None:
+            return 0
+        start_date = start_date or timezone.localdate(bounds['first'])
+        end_date = end_date or timezone.localdate(bounds['last'])
+
+    written = 0
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+        low, high = period_bounds(chunk_start, chunk_end)
+
+        with transaction.atomic():
+            DailyDealerSales.objects.filter(day__range=[chunk_start, chunk_end]).delete()
+            DailyItemSales.objects.filter(day__range=[chunk_start, chunk_end]).delete()
+
+            dealer_days = Sale.objects.filter(
+                status='completed',
+                created_at__gte=low,
+                created_at__lt=high
+            ).annotate(sale_day=TruncDate('created_at')).values('sale_day', 'dealer').annotate(
+                total=Sum('total_amount'),
+                count=Count('id')
+            ).order_by()
+            dealer_rows = [
+                DailyDealerSales(day=row['sale_day'], dealer_id=row['dealer'], total_sales=row['total'], transaction_count=row['count'])
+                for row in dealer_days.iterator()
+            ]
+            DailyDealerSales.objects.bulk_create(dealer_rows, batch_size=1000)
+            written += len(dealer_rows)
+
+            item_days = SaleItem.objects.filter(
+                sale__status='completed',
+                sale__created_at__gte=low,
+                sale__created_at__lt=high
+            ).annotate(sale_day=TruncDate('sale__created_at')).values('sale_day', 'sale__dealer', 'item').annotate(
+                total_quantity=Sum('quantity'),
+                total_revenue=Sum('total_price')
+            ).order_by()
+            DailyItemSales.objects.bulk_create([
+                DailyItemSales(
+                    day=row['sale_day'],
+                    dealer_id=row['sale__dealer'],
+                    item_id=row['item'],
+                    quantity=row['total_quantity'],
+                    revenue=row['total_revenue']
+                )
+                for row in item_days.iterator()
+            ], batch_size=1000)
+
+        if progress:
+            progress(chunk_start, chunk_end)
+        chunk_start = chunk_end + timedelta(days=1)
+
+    return written
+
+
+def sales_totals(start_date, end_date, dealer=None):
+    """Total completed sales and transaction count for the date range"""
+    rows = DailyDealerSales.objects.filter(day__range=[start_date, end_date])
+    if dealer:
+        rows = rows.filter(dealer=dealer)
+    totals = rows.aggregate(total_sales=Sum('total_sales'), total_transactions=Sum('transaction_count'))
+    return {
+        'total_sales': totals['total_sales'] or 0,
+        'total_transactions': totals['total_transactions'] or 0,
+    }
+
+
+def top_items(start_date, end_date, dealer=None, limit=10):
+    """Best selling items by revenue for the date range"""
+    rows = DailyItemSales.objects.filter(day__range=[start_date, end_date])
+    if dealer:
+        rows = rows.filter(dealer=dealer)
+    return rows.values('item__name').annotate(
+        total_quantity=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    ).order_by('-total_revenue')[:limit]
+
+
+def category_revenue(start_date, end_date, dealer=None):
+    """Units sold and revenue per item category for the date range, highest revenue first"""
+    rows = DailyItemSales.objects.filter(day__range=[start_date, end_date])
+    if dealer:
+        rows = rows.filter(dealer=dealer)
+    return rows.values('item__category').annotate(
+        total_quantity=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    ).order_by('-total_revenue')
+
+
+def top_dealers(start_date, end_date, limit=10):
+    """Dealers with the highest completed sales for the date range"""
+    return DailyDealerSales.objects.filter(day__range=[start_date, end_date]).values('dealer__username').annotate(
+        total_sales=Sum('total_sales'),
+        transaction_count=Sum('transaction_count')
+    ).order_by('-total_sales')[:limit]
@@ -0,0 +1,125 @@
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from inventory.models import DealerStock, StockMovement
+from inventory.movements import record_movements
+from .models import Sale, SaleItem
+from .rollups import record_completed_sale
+
+
+class SaleValidationError(Exception):
+    """Raised when a sale cannot be built from the submitted cart lines"""
+
+
+def _parse_lines(items):
+    """Normalise raw cart lines into (item_id, quantity, unit_price) tuples"""
+    lines = []
+    for item_data in items:
+        try:
+            item_id = int(item_data.get('item_id'))
+            quantity = int(item_data.get('quantity'))
+            unit_price = item_data.get('unit_price')
+            unit_price = Decimal(str(unit_price)) if unit_price not in (None, '') else None
+        except (TypeError, ValueError, InvalidOperation):
+            raise SaleValidationError('Invalid item data')
+
+        if quantity <= 0:
+            raise SaleValidationError('Quantity must be greater than zero')
+        if unit_price is not None and unit_price < 0:
+            raise SaleValidationError('Unit price cannot be negative')
+
+        lines.append((item_id, quantity, unit_price))
+    return lines
+
+
+def build_sale(dealer, customer_name, customer_phone, items, customer_email='', created_by=None):
+    """
+    Create a completed sale for ``dealer`` from a list of cart lines.
+
+    Every DealerStock row the sale touches is fetched and locked in a single
+    query, all lines are validated before anything is written, the SaleItems
+    are bulk inserted and the allocations are applied with one conditional
+    F() update. The daily sales rollups are updated in the same transaction.
+    The number of queries does not depend on the number of lines, and the
+    whole sale is rolled back if any line fails.
+    """
+    lines = _parse_lines(items)
+    if not lines:
+        raise SaleValidationError('No items selected')
+
+    # The same item may appear on several lines; allocate against the total
+    requested = {}
+    for item_id, quantity, _ in lines:
+        requested[item_id] = requested.get(item_id, 0) + quantity
+
+    with transaction.atomic():
+        stocks = DealerStock.objects.select_for_update().select_related('item').filter(
+            dealer=dealer,
+            item_id__in=requested.keys()
+        ).order_by('pk')
+        stocks = {stock.item_id: stock for stock in stocks}
+
+        for item_id, quantity in requested.items():
+            stock = stocks.get(item_id)
+            if stock is None:
+                raise SaleValidationError(f'Item {item_id} is not in your stock')
+            if stock.available_quantity < quantity:
+                raise SaleValidationError(f'Insufficient stock for {stock.item.name}')
+
+        sale_items = []
+        total_amount = Decimal('0')
+        for item_id, quantity, unit_price in lines:
+            stock = stocks[item_id]
+            if unit_price is None:
+                unit_price = stock.selling_price
+            # bulk_create() bypasses SaleItem.save(), so compute the total here
+            total_price = quantity * unit_price
+            total_amount += total_price
+            sale_items.append(SaleItem(
+                item_id=item_id,
+                dealer_stock=stock,
+                quantity=quantity,
+                unit_price=unit_price,
+                total_price=total_price
+            ))
+
+        sale = Sale.objects.create(
+            dealer=dealer,
+            customer_name=customer_name,
+            customer_phone=customer_phone,
+            customer_email=customer_email,
+            total_amount=total_amount,
+            status='completed',
+            created_by=created_by
+        )
+
+        for sale_item in sale_items:
+            sale_item.sale = sale
+        SaleItem.objects.bulk_create(sale_items)
+
+        DealerStock.objects.filter(pk__in=[stock.pk for stock in stocks.values()]).update(
+            allocated_quantity=F('allocated_quantity') + Case(
+                *[When(pk=stocks[item_id].pk, then=Value(quantity)) for item_id, quantity in requested.items()],
+                default=Value(0),
+                output_field=IntegerField()
+            ),
+            updated_at=timezone.now()
+        )
+
+        # Sold units stay in DealerStock.quantity until delivery, but leave the sellable stock now
+        record_movements([
+            StockMovement(
+                item_id=item_id,
+                dealer=dealer,
+                movement_type='sale',
+                quantity_change=-quantity,
+                reference=f"SALE-{sale.pk}",
+                created_by=created_by
+            )
+            for item_id, quantity in requested.items()
+        ])
+
+        record_completed_sale(sale, sale_items)
+
+    return sale
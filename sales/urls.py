@@ -9,6 +9,8 @@ urlpatterns = [
     path("dealer/sales/create/", views.create_sale_view, name="create_sale"),
     path("dealer/sales/<int:sale_id>/", views.sale_detail_view, name="sale_detail"),
     path("dealer/sales/<int:sale_id>/generate-invoice/", views.generate_invoice_view, name="generate_invoice"),
+    path("dealer/sales/<int:sale_id>/invoice/", views.invoice_document_view, name="invoice_document"),
+    path("invoices/download/", views.download_invoices_zip_view, name="download_invoices_zip"),
     
     # Reports
     path("dealer/reports/sales/", views.dealer_sales_report_view, name="dealer_sales_report"),
@@ -19,6 +21,9 @@ urlpatterns = [
     path("admin/payouts/", views.admin_payouts_view, name="admin_payouts"),
     path("admin/payouts/calculate/", views.calculate_payouts_view, name="calculate_payouts"),
     
+    # Exports
+    path("admin/exports/<str:kind>/", views.admin_export_view, name="admin_export"),
+    
     # Customer Purchasing
     path("customer/products/", views.customer_browse_products, name="customer_browse"),
     path("customer/cart/", views.customer_view_cart, name="customer_cart"),
@@ -30,5 +35,7 @@ urlpatterns = [
     
     # Dealer Order Management
     path("dealer/orders/", views.dealer_order_list, name="dealer_order_list"),
+    path("dealer/orders/feed/", views.dealer_order_feed, name="dealer_order_feed"),
     path("dealer/orders/<int:order_id>/approve/", views.dealer_approve_order, name="dealer_approve_order"),
+    path("dealer/orders/bulk-approve/", views.dealer_bulk_approve_orders, name="dealer_bulk_approve_orders"),
 ]
@@ -1,15 +1,28 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from django.db.models import Sum, Count
+from django.http import JsonResponse, FileResponse, StreamingHttpResponse
+from django.core.paginator import Page, Paginator
+from django.db import transaction
+from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Sale, SaleItem, Invoice, DealerPayout
+from .models import Sale, SaleItem, Invoice, DealerPayout, CustomerOrder, OrderItem
+from .sale_builder import build_sale
+from .cart import add_to_cart, remove_from_cart, clear_cart, get_cart_lines, cart_quantity
+from .reservations import ReservationError, reserve_cart, commit_reservations, with_available_to_sell, get_reservation_ttl
+from .order_approval import approve_order, approve_orders
+from .pagination import keyset_page
+from .payouts import calculate_payouts
+from .dates import parse_date, period_bounds
+from . import rollups
+from .invoicing import ensure_rendered, period_invoices, stream_invoice_zip
+from .exports import EXPORT_FORMATS, SALE_COLUMNS, ORDER_COLUMNS, PAYOUT_COLUMNS, export_response, sales_for_export, orders_for_export, payouts_for_export
 from inventory.models import DealerStock, WarehouseItem
+from inventory.catalog_cache import cached_catalog
+from inventory.search import category_facets, search_products
 from accounts.models import User
 import json
-import uuid
 
 @login_required
 def dealer_sales_view(request):
@@ -56,57 +69,15 @@ def create_sale_view(request):
             if not items:
                 return JsonResponse({'success': False, 'error': 'No items selected'})
             
-            # Create sale
-            sale = Sale.objects.create(
+            sale = build_sale(
                 dealer=request.user,
                 customer_name=customer_name,
                 customer_phone=customer_phone,
                 customer_email=customer_email,
+                items=items,
                 created_by=request.user
             )
             
-            total_amount = 0
-            
-            # Add items to sale
-            for item_data in items:
-                item_id = item_data.get('item_id')
-                quantity = int(item_data.get('quantity'))
-                unit_price = float(item_data.get('unit_price'))
-                
-                dealer_stock = get_object_or_404(DealerStock, 
-                    dealer=request.user, 
-                    item_id=item_id,
-                    quantity__gte=quantity
-                )
-                
-                # Check if enough stock available
-                if dealer_stock.available_quantity < quantity:
-                    sale.delete()  # Clean up
-                    return JsonResponse({
-                        'success': False, 
-                        'error': f'Insufficient stock for {dealer_stock.item.name}'
-                    })
-                
-                # Create sale item
-                SaleItem.objects.create(
-                    sale=sale,
-                    item=dealer_stock.item,
-                    dealer_stock=dealer_stock,
-                    quantity=quantity,
-                    unit_price=unit_price,
-                    total_price=quantity * unit_price
-                )
-                
-                total_amount += quantity * unit_price
-                
-                # Update allocated quantity
-                dealer_stock.allocated_quantity += quantity
-                dealer_stock.save()
-            
-            sale.total_amount = total_amount
-            sale.status = 'completed'
-            sale.save()
-            
             return JsonResponse({
                 'success': True, 
                 'sale_id': sale.id,
@@ -179,7 +150,7 @@ def generate_invoice_view(request, sale_id):
             grand_total = subtotal + tax_amount - discount_amount
             
             # Generate unique invoice number
-            invoice_number = f"INV-{timezone.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+            invoice_number = Invoice.generate_invoice_number()
             
             # Create invoice
             invoice = Invoice.objects.create(
@@ -191,6 +162,9 @@ def generate_invoice_view(request, sale_id):
                 grand_total=grand_total
             )
             
+            # Render and cache the invoice document right away
+            ensure_rendered([invoice])
+            
             messages.success(request, f"Invoice {invoice_number} generated successfully.")
             return redirect('sales:sale_detail', sale_id=sale_id)
             
@@ -203,6 +177,57 @@ def generate_invoice_view(request, sale_id):
     
     return render(request, 'sales/generate_invoice.html', context)
 
+@login_required
+def invoice_document_view(request, sale_id):
+    """Serve the rendered invoice document for a sale"""
+    sale = get_object_or_404(Sale, id=sale_id)
+    
+    # Check access rights
+    if request.user.user_type == 'dealer' and sale.dealer != request.user:
+        messages.error(request, "Access denied. You can only view invoices for your own sales.")
+        return redirect('sales:dealer_sales')
+    
+    if request.user.user_type not in ['admin', 'dealer']:
+        messages.error(request, "Access denied.")
+        return redirect('dashboard:index')
+    
+    invoice = get_object_or_404(Invoice.objects.select_related('sale__dealer'), sale=sale)
+    path = ensure_rendered([invoice])[invoice.invoice_number]
+    
+    return FileResponse(open(path, 'rb'), content_type='text/html')
+
+@login_required
+def download_invoices_zip_view(request):
+    """Stream every invoice document of a period as a ZIP archive"""
+    if request.user.user_type not in ['admin', 'dealer']:
+        messages.error(request, "Access denied.")
+        return redirect('dashboard:index')
+    
+    try:
+        start_date = parse_date(request.GET.get('start_date'))
+        end_date = parse_date(request.GET.get('end_date'))
+    except ValueError:
+        start_date = end_date = None
+    if not start_date or not end_date:
+        messages.error(request, "Please provide a valid start and end date.")
+        return redirect('dashboard:index')
+    
+    # Dealers only get their own invoices; admins may filter by dealer
+    if request.user.user_type == 'dealer':
+        dealer = request.user
+    else:
+        try:
+            dealer = int(request.GET['dealer_id']) if request.GET.get('dealer_id') else None
+        except ValueError:
+            messages.error(request, "Invalid dealer.")
+            return redirect('dashboard:index')
+    
+    invoices = period_invoices(start_date, end_date, dealer)
+    
+    response = StreamingHttpResponse(stream_invoice_zip(invoices), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="invoices_{start_date}_{end_date}.zip"'
+    return response
+
 @login_required
 def dealer_sales_report_view(request):
     """Dealer view of their sales reports"""
@@ -219,23 +244,21 @@ def dealer_sales_report_view(request):
     if not end_date:
         end_date = timezone.now().strftime('%Y-%m-%d')
     
+    # Sales list for the template; totals and rankings come from the daily rollups
+    range_start, range_end = period_bounds(parse_date(start_date), parse_date(end_date))
     sales = Sale.objects.filter(
         dealer=request.user,
-        created_at__date__range=[start_date, end_date],
+        created_at__gte=range_start,
+        created_at__lt=range_end,
         status='completed'
     )
     
-    total_sales = sales.aggregate(total=Sum('total_amount'))['total'] or 0
-    total_transactions = sales.count()
+    totals = rollups.sales_totals(start_date, end_date, dealer=request.user)
+    total_sales = totals['total_sales']
+    total_transactions = totals['total_transactions']
     
     # Top selling items
-    top_items = SaleItem.objects.filter(
-        sale__dealer=request.user,
-        sale__created_at__date__range=[start_date, end_date]
-    ).values('item__name').annotate(
-        total_quantity=Sum('quantity'),
-        total_revenue=Sum('total_price')
-    ).order_by('-total_revenue')[:10]
+    top_items = rollups.top_items(start_date, end_date, dealer=request.user)
     
     context = {
         'sales': sales,
@@ -265,8 +288,10 @@ def admin_sales_report_view(request):
     if not end_date:
         end_date = timezone.now().strftime('%Y-%m-%d')
     
+    range_start, range_end = period_bounds(parse_date(start_date), parse_date(end_date))
     sales = Sale.objects.filter(
-        created_at__date__range=[start_date, end_date],
+        created_at__gte=range_start,
+        created_at__lt=range_end,
         status='completed'
     ).select_related('dealer')
     
@@ -274,17 +299,12 @@ def admin_sales_report_view(request):
     if dealer_id:
         sales = sales.filter(dealer_id=dealer_id)
     
-    total_sales = sales.aggregate(total=Sum('total_amount'))['total'] or 0
-    total_transactions = sales.count()
+    totals = rollups.sales_totals(start_date, end_date, dealer=dealer_id)
+    total_sales = totals['total_sales']
+    total_transactions = totals['total_transactions']
     
     # Top dealers
-    top_dealers = Sale.objects.filter(
-        created_at__date__range=[start_date, end_date],
-        status='completed'
-    ).values('dealer__username').annotate(
-        total_sales=Sum('total_amount'),
-        transaction_count=Count('id')
-    ).order_by('-total_sales')[:10]
+    top_dealers = rollups.top_dealers(start_date, end_date)
     
     # All dealers for filter dropdown
     dealers = User.objects.filter(user_type='dealer')
@@ -346,6 +366,44 @@ def admin_payouts_view(request):
     
     return render(request, 'sales/admin_payouts.html', context)
 
+EXPORTS = {
+    'sales': (sales_for_export, SALE_COLUMNS),
+    'orders': (orders_for_export, ORDER_COLUMNS),
+    'payouts': (payouts_for_export, PAYOUT_COLUMNS),
+}
+
+@login_required
+def admin_export_view(request, kind):
+    """Stream sales, orders or payouts as CSV or NDJSON for accounting"""
+    if request.user.user_type != 'admin':
+        messages.error(request, "Access denied. Admin access required.")
+        return redirect('dashboard:index')
+    
+    export_format = request.GET.get('format', 'csv')
+    if kind not in EXPORTS or export_format not in EXPORT_FORMATS:
+        messages.error(request, "Unknown export.")
+        return redirect('dashboard:index')
+    
+    # Same filters as the report pages
+    try:
+        start_date = parse_date(request.GET.get('start_date') or None)
+        end_date = parse_date(request.GET.get('end_date') or None)
+    except ValueError:
+        messages.error(request, "Invalid date format.")
+        return redirect('dashboard:index')
+    try:
+        dealer_id = int(request.GET['dealer_id']) if request.GET.get('dealer_id') else None
+    except ValueError:
+        messages.error(request, "Invalid dealer.")
+        return redirect('dashboard:index')
+    status = request.GET.get('status') or None
+    
+    get_queryset, columns = EXPORTS[kind]
+    queryset = get_queryset(start_date, end_date, dealer_id, status)
+    
+    filename = f"{kind}_{start_date}_{end_date}" if start_date and end_date else kind
+    return export_response(queryset, columns, filename, export_format)
+
 @login_required
 def calculate_payouts_view(request):
     """Calculate dealer payouts for a period"""
@@ -359,36 +417,10 @@ def calculate_payouts_view(request):
             period_end = datetime.strptime(request.POST.get('period_end'), '%Y-%m-%d').date()
             commission_rate = float(request.POST.get('commission_rate', 5.0))
             
-            # Get all dealers
-            dealers = User.objects.filter(user_type='dealer')
+            # One grouped query over all dealers, then batched upserts
+            written = calculate_payouts(period_start, period_end, commission_rate)
             
-            for dealer in dealers:
-                # Calculate total sales for this dealer in the period
-                total_sales = Sale.objects.filter(
-                    dealer=dealer,
-                    created_at__date__range=[period_start, period_end],
-                    status='completed'
-                ).aggregate(total=Sum('total_amount'))['total'] or 0
-                
-                if total_sales > 0:
-                    # Create or update payout record
-                    payout, created = DealerPayout.objects.get_or_create(
-                        dealer=dealer,
-                        period_start=period_start,
-                        period_end=period_end,
-                        defaults={
-                            'total_sales': total_sales,
-                            'commission_rate': commission_rate,
-                        }
-                    )
-                    
-                    if not created:
-                        payout.total_sales = total_sales
-                        payout.commission_rate = commission_rate
-                    
-                    payout.calculate_payout()
-            
-            messages.success(request, "Payouts calculated successfully.")
+            messages.success(request, f"Payouts calculated successfully for {written} dealer(s).")
             return redirect('sales:admin_payouts')
             
         except Exception as e:
@@ -403,6 +435,27 @@ def calculate_payouts_view(request):
 
 # === CUSTOMER PURCHASING VIEWS ===
 
+CATALOG_PAGE_SIZE = 24
+
+def _catalog_page(category, search_term, page_number):
+    """One page of the customer catalog plus its category facets, served from the catalog cache"""
+    # Products available from warehouse, net of stock held by other checkouts
+    products = with_available_to_sell(WarehouseItem.objects.all()).filter(available_to_sell__gt=0)
+    matches = search_products(products, search_term) if search_term else products
+    listing = matches.filter(category=category) if category else matches
+    paginator = Paginator(listing, CATALOG_PAGE_SIZE)
+    
+    def build_page():
+        page = paginator.get_page(page_number)
+        return {'number': page.number, 'count': paginator.count, 'items': list(page.object_list)}
+    
+    # A category page only goes stale when that category changes; facets span every category
+    entry = cached_catalog('browse', (search_term.lower(), page_number), build_page, [category] if category else None)
+    facets = cached_catalog('facets', (search_term.lower(),), lambda: category_facets(matches))
+    
+    paginator.count = entry['count']
+    return Page(entry['items'], entry['number'], paginator), facets
+
 @login_required
 def customer_browse_products(request):
     """Customer can browse available products"""
@@ -410,21 +463,17 @@ def customer_browse_products(request):
         messages.error(request, "Access denied. Customer access required.")
         return redirect('dashboard:index')
     
-    # Get products available from warehouse
-    products = WarehouseItem.objects.filter(quantity__gt=0)
-    
-    # Filter by category if specified
-    category = request.GET.get('category')
-    if category:
-        products = products.filter(category=category)
+    category = request.GET.get('category') or None
+    if category not in dict(WarehouseItem.CATEGORY_CHOICES):
+        category = None
+    search_term = (request.GET.get('search') or '').strip()
+    try:
+        page_number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page_number = 1
     
-    # Search functionality
-    search_term = request.GET.get('search')
-    if search_term:
-        products = products.filter(
-            models.Q(name__icontains=search_term) | 
-            models.Q(description__icontains=search_term)
-        )
+    # Ranked search plus per-category counts, then filter by category if specified
+    products, category_facets = _catalog_page(category, search_term, page_number)
     
     # Get categories for filter
     categories = WarehouseItem.CATEGORY_CHOICES
@@ -432,6 +481,8 @@ def customer_browse_products(request):
     context = {
         'products': products,
         'categories': categories,
+        'category_facets': category_facets,
+        'page_range': products.paginator.get_elided_page_range(products.number),
         'filter_category': category,
         'search_term': search_term,
     }
@@ -450,37 +501,18 @@ def customer_add_to_cart(request):
             product_id = data.get('product_id')
             quantity = int(data.get('quantity', 1))
             
-            product = get_object_or_404(WarehouseItem, id=product_id)
+            product = get_object_or_404(with_available_to_sell(WarehouseItem.objects.all()), id=product_id)
             
-            # Check if product has stock
-            if product.quantity < quantity:
+            # Check if product has stock that is not held by another checkout
+            if product.available_to_sell < quantity:
                 return JsonResponse({'error': 'Insufficient stock available'}, status=400)
             
-            # Get or create cart in session
-            if 'cart' not in request.session:
-                request.session['cart'] = {}
-            
-            cart = request.session['cart']
-            
-            # Add to cart
-            product_key = str(product_id)
-            if product_key in cart:
-                cart[product_key]['quantity'] += quantity
-            else:
-                cart[product_key] = {
-                    'product_id': product_id,
-                    'name': product.name,
-                    'price': float(product.unit_price),
-                    'quantity': quantity,
-                    'image': ''  # Add image field if available
-                }
-            
-            request.session.modified = True
+            add_to_cart(request.user, product, quantity)
             
             return JsonResponse({
                 'success': True,
                 'message': f'{product.name} added to cart',
-                'cart_count': sum(item['quantity'] for item in cart.values())
+                'cart_count': cart_quantity(request.user)
             })
             
         except Exception as e:
@@ -488,6 +520,21 @@ def customer_add_to_cart(request):
     
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
+def _cart_items(lines, products=None):
+    """Build template rows from cart lines, optionally using freshly locked products"""
+    cart_items = []
+    for line in lines:
+        product = products.get(line.product_id) if products is not None else line.product
+        if product is None:
+            continue
+        cart_items.append({
+            'product': product,
+            'quantity': line.quantity,
+            'price': line.unit_price,
+            'total': line.total_price
+        })
+    return cart_items
+
 @login_required
 def customer_view_cart(request):
     """View customer's shopping cart"""
@@ -495,26 +542,8 @@ def customer_view_cart(request):
         messages.error(request, "Access denied. Customer access required.")
         return redirect('dashboard:index')
     
-    cart = request.session.get('cart', {})
-    cart_items = []
-    total_amount = 0
-    
-    for item_data in cart.values():
-        try:
-            product = WarehouseItem.objects.get(id=item_data['product_id'])
-            item_total = item_data['quantity'] * item_data['price']
-            total_amount += item_total
-            
-            cart_items.append({
-                'product': product,
-                'quantity': item_data['quantity'],
-                'price': item_data['price'],
-                'total': item_total
-            })
-        except WarehouseItem.DoesNotExist:
-            # Remove invalid items from cart
-            del cart[str(item_data['product_id'])]
-            request.session.modified = True
+    cart_items = _cart_items(get_cart_lines(request.user))
+    total_amount = sum(item['total'] for item in cart_items)
     
     context = {
         'cart_items': cart_items,
@@ -531,12 +560,7 @@ def customer_remove_from_cart(request, product_id):
         messages.error(request, "Access denied. Customer access required.")
         return redirect('dashboard:index')
     
-    cart = request.session.get('cart', {})
-    product_key = str(product_id)
-    
-    if product_key in cart:
-        del cart[product_key]
-        request.session.modified = True
+    if remove_from_cart(request.user, product_id):
         messages.success(request, "Item removed from cart")
     else:
         messages.error(request, "Item not found in cart")
@@ -550,77 +574,47 @@ def customer_checkout(request):
         messages.error(request, "Access denied. Customer access required.")
         return redirect('dashboard:index')
     
-    cart = request.session.get('cart', {})
+    cart_lines = get_cart_lines(request.user, hydrate=False)
     
-    if not cart:
+    if not cart_lines:
         messages.error(request, "Your cart is empty")
         return redirect('sales:customer_browse')
     
+    lines = {line.product_id: line.quantity for line in cart_lines}
+    empty_checkout = {
+        'cart_items': [],
+        'total_amount': 0,
+        'customer': request.user
+    }
+    
     if request.method == 'POST':
+        # Get form data
+        shipping_address = request.POST.get('shipping_address', '').strip()
+        phone_number = request.POST.get('phone_number', '').strip()
+        notes = request.POST.get('notes', '').strip()
+        
+        if not all([shipping_address, phone_number]):
+            messages.error(request, "Please fill in all required fields")
+            return render(request, 'sales/customer_checkout.html', empty_checkout)
+        
+        # Validate phone number
+        if len(phone_number) < 10:
+            messages.error(request, "Please enter a valid phone number")
+            return render(request, 'sales/customer_checkout.html', empty_checkout)
+        
+        total_amount = sum(line.total_price for line in cart_lines)
+        if total_amount <= 0:
+            messages.error(request, "Cart total must be greater than zero")
+            return render(request, 'sales/customer_checkout.html', empty_checkout)
+        
         try:
             with transaction.atomic():
-                # Get form data
-                shipping_address = request.POST.get('shipping_address', '').strip()
-                phone_number = request.POST.get('phone_number', '').strip()
-                notes = request.POST.get('notes', '').strip()
-                
-                if not all([shipping_address, phone_number]):
-                    messages.error(request, "Please fill in all required fields")
-                    return render(request, 'sales/customer_checkout.html', {
-                        'cart_items': [],
-                        'total_amount': 0,
-                        'customer': request.user
-                    })
-                
-                # Validate phone number
-                if len(phone_number) < 10:
-                    messages.error(request, "Please enter a valid phone number")
-                    return render(request, 'sales/customer_checkout.html', {
-                        'cart_items': [],
-                        'total_amount': 0,
-                        'customer': request.user
-                    })
-                
-                # Calculate total amount
-                total_amount = 0
-                cart_items = []
+                # Renew the holds placed when checkout started; this also re-checks availability
+                products = reserve_cart(request.user, lines)
+                if len(products) != len(lines):
+                    raise ReservationError("One or more products are no longer available")
                 
-                for item_data in cart.values():
-                    try:
-                        product = WarehouseItem.objects.get(id=item_data['product_id'])
-                        # Check if product still exists and has stock
-                        if product.quantity < item_data['quantity']:
-                            messages.error(request, f"Insufficient stock for {product.name}")
-                            return render(request, 'sales/customer_checkout.html', {
-                                'cart_items': [],
-                                'total_amount': 0,
-                                'customer': request.user
-                            })
-                        
-                        item_total = item_data['quantity'] * item_data['price']
-                        total_amount += item_total
-                        
-                        cart_items.append({
-                            'product': product,
-                            'quantity': item_data['quantity'],
-                            'price': item_data['price'],
-                            'total': item_total
-                        })
-                    except WarehouseItem.DoesNotExist:
-                        messages.error(request, "One or more products are no longer available")
-                        return render(request, 'sales/customer_checkout.html', {
-                            'cart_items': [],
-                            'total_amount': 0,
-                            'customer': request.user
-                        })
-                
-                if total_amount <= 0:
-                    messages.error(request, "Cart total must be greater than zero")
-                    return render(request, 'sales/customer_checkout.html', {
-                        'cart_items': [],
-                        'total_amount': 0,
-                        'customer': request.user
-                    })
+                cart_items = _cart_items(cart_lines, products)
                 
                 # Create customer order
                 # Assign a dealer to the order (for demo, assign the first dealer or create temp assignment)
@@ -633,7 +627,6 @@ def customer_checkout(request):
                 order = CustomerOrder.objects.create(
                     customer=request.user,
                     dealer=dealer,  # Assign dealer to order
-                    order_number=f"ORD-{uuid.uuid4().hex[:8].upper()}",
                     status='pending',
                     payment_status='cod',
                     total_amount=total_amount,
@@ -642,60 +635,53 @@ def customer_checkout(request):
                     notes=notes
                 )
                 
-                # Create order items
-                for item in cart_items:
-                    OrderItem.objects.create(
+                # Create order items (bulk_create skips OrderItem.save, so total_price is set here)
+                OrderItem.objects.bulk_create([
+                    OrderItem(
                         order=order,
                         product=item['product'],
                         quantity=item['quantity'],
                         unit_price=item['price'],
                         total_price=item['total']
                     )
+                    for item in cart_items
+                ])
                 
-                # Clear cart
-                del request.session['cart']
-                request.session.modified = True
-                
-                messages.success(request, f"Order placed successfully! Order Number: {order.order_number}")
-                return redirect('sales:customer_order_detail', order_id=order.id)
+                # Keep the stock held until the dealer approves the order
+                commit_reservations(request.user, order)
                 
+                # Clear cart
+                clear_cart(request.user)
+            
+            messages.success(request, f"Order placed successfully! Order Number: {order.order_number}")
+            return redirect('sales:customer_order_detail', order_id=order.id)
+            
+        except ReservationError as e:
+            messages.error(request, str(e))
+            return render(request, 'sales/customer_checkout.html', empty_checkout)
         except Exception as e:
             messages.error(request, f"Error placing order: {str(e)}")
             # Log the error for debugging
             import logging
             logger = logging.getLogger(__name__)
             logger.error(f"Checkout error: {str(e)}", exc_info=True)
-            return render(request, 'sales/customer_checkout.html', {
-                'cart_items': [],
-                'total_amount': 0,
-                'customer': request.user
-            })
+            return render(request, 'sales/customer_checkout.html', empty_checkout)
     
-    # GET request - show checkout form
-    cart_items = []
-    total_amount = 0
+    # GET request - hold the stock for this cart while the customer fills in the form
+    try:
+        products = reserve_cart(request.user, lines)
+    except ReservationError as e:
+        messages.error(request, str(e))
+        return redirect('sales:customer_cart')
     
-    for item_data in cart.values():
-        try:
-            product = WarehouseItem.objects.get(id=item_data['product_id'])
-            item_total = item_data['quantity'] * item_data['price']
-            total_amount += item_total
-            
-            cart_items.append({
-                'product': product,
-                'quantity': item_data['quantity'],
-                'price': item_data['price'],
-                'total': item_total
-            })
-        except WarehouseItem.DoesNotExist:
-            # Remove invalid items from cart
-            del cart[str(item_data['product_id'])]
-            request.session.modified = True
+    cart_items = _cart_items(cart_lines, products)
+    total_amount = sum(item['total'] for item in cart_items)
     
     context = {
         'cart_items': cart_items,
         'total_amount': total_amount,
-        'customer': request.user
+        'customer': request.user,
+        'reservation_minutes': int(get_reservation_ttl().total_seconds() // 60),
     }
     
     return render(request, 'sales/customer_checkout.html', context)
@@ -732,6 +718,27 @@ def customer_order_history(request):
     return render(request, 'sales/customer_order_history.html', context)
 
 # Dealer views for order approval
+ORDER_PAGE_SIZE = 25
+
+def _dealer_order_page(request):
+    """Keyset page of the dealer's orders for the current GET filters"""
+    orders = CustomerOrder.objects.filter(dealer=request.user).select_related('customer').annotate(
+        line_count=Count('order_items')
+    )
+    
+    # Filter by status if specified
+    status = request.GET.get('status')
+    if status:
+        orders = orders.filter(status=status)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', ORDER_PAGE_SIZE)), 1), 100)
+    except ValueError:
+        limit = ORDER_PAGE_SIZE
+    
+    page, next_cursor = keyset_page(orders, request.GET.get('cursor'), limit)
+    return page, next_cursor, status
+
 @login_required
 def dealer_order_list(request):
     """Dealer views orders assigned to them"""
@@ -739,22 +746,59 @@ def dealer_order_list(request):
         messages.error(request, "Access denied. Dealer access required.")
         return redirect('dashboard:index')
     
-    # For demo purposes, show all orders to all dealers
-    # In production, you'd filter by assigned dealer or region
-    orders = CustomerOrder.objects.all().order_by('-created_at')
-    
-    # Filter by status if specified
-    status = request.GET.get('status')
-    if status:
-        orders = orders.filter(status=status)
+    try:
+        orders, next_cursor, status = _dealer_order_page(request)
+    except ValueError:
+        messages.error(request, "Invalid page cursor.")
+        return redirect('sales:dealer_order_list')
+    
+    # Inbox totals in one conditional aggregate over the (dealer, status, created_at) index
+    stats = CustomerOrder.objects.filter(dealer=request.user).aggregate(
+        total_orders=Count('id'),
+        pending_count=Count('id', filter=Q(status='pending')),
+        approved_count=Count('id', filter=Q(status='approved')),
+        total_revenue=Sum('total_amount', filter=~Q(status__in=['pending', 'cancelled'])),
+    )
     
     context = {
         'orders': orders,
-        'status_filter': status
+        'status_filter': status,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+        **stats,
     }
     
     return render(request, 'sales/dealer_order_list.html', context)
 
+@login_required
+def dealer_order_feed(request):
+    """JSON variant of the dealer order inbox for infinite scroll"""
+    if request.user.user_type != 'dealer':
+        return JsonResponse({'error': 'Dealer access required'}, status=403)
+    
+    try:
+        orders, next_cursor, status = _dealer_order_page(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'orders': [
+            {
+                'id': order.id,
+                'order_number': order.order_number,
+                'customer': order.customer.get_full_name() or order.customer.username,
+                'customer_email': order.customer.email,
+                'created_at': order.created_at.isoformat(),
+                'items_count': order.line_count,
+                'total_amount': str(order.total_amount),
+                'status': order.status,
+                'payment_status': order.payment_status,
+            }
+            for order in orders
+        ],
+        'next_cursor': next_cursor,
+    })
+
 @login_required
 def dealer_approve_order(request, order_id):
     """Dealer approves customer order"""
@@ -762,36 +806,16 @@ def dealer_approve_order(request, order_id):
         messages.error(request, "Access denied. Dealer access required.")
         return redirect('dashboard:index')
     
-    # For demo purposes, allow any dealer to approve any order
-    # In production, you'd check if this dealer is assigned to the order
-    order = get_object_or_404(CustomerOrder, id=order_id)
+    order = get_object_or_404(CustomerOrder, id=order_id, dealer=request.user)
     
     if request.method == 'POST':
         try:
-            with transaction.atomic():
-                # Update order status
-                order.status = 'approved'
-                order.approved_at = timezone.now()
-                # Assign the approving dealer
-                order.dealer = request.user
-                order.save()
-                
-                # Create receipt
-                Receipt.objects.create(
-                    order=order,
-                    amount_paid=order.total_amount,
-                    payment_method='cod',
-                    issued_by=request.user
-                )
-                
-                # Reduce stock from warehouse (in real system, would reduce from dealer stock)
-                for order_item in order.order_items.all():
-                    order_item.product.quantity -= order_item.quantity
-                    order_item.product.save()
-                
-                messages.success(request, f"Order {order.order_number} approved successfully!")
-                return redirect('sales:dealer_order_list')
-                
+            # Deducts warehouse stock with a conditional update, so a shortfall fails the whole order
+            approve_order(order, request.user)
+            
+            messages.success(request, f"Order {order.order_number} approved successfully!")
+            return redirect('sales:dealer_order_list')
+            
         except Exception as e:
             messages.error(request, f"Error approving order: {str(e)}")
     
@@ -800,3 +824,40 @@ def dealer_approve_order(request, order_id):
     }
     
     return render(request, 'sales/dealer_approve_order.html', context)
+
+@login_required
+def dealer_bulk_approve_orders(request):
+    """Dealer approves a batch of pending customer orders at once"""
+    if request.user.user_type != 'dealer':
+        messages.error(request, "Access denied. Dealer access required.")
+        return redirect('dashboard:index')
+    
+    if request.method != 'POST':
+        return redirect('sales:dealer_order_list')
+    
+    is_json = request.content_type == 'application/json'
+    try:
+        if is_json:
+            order_ids = [int(order_id) for order_id in json.loads(request.body).get('order_ids', [])]
+        else:
+            order_ids = [int(order_id) for order_id in request.POST.getlist('order_ids')]
+        
+        approved, failures = approve_orders(order_ids, request.user)
+    except Exception as e:
+        if is_json:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        messages.error(request, f"Error approving orders: {str(e)}")
+        return redirect('sales:dealer_order_list')
+    
+    if is_json:
+        return JsonResponse({
+            'success': True,
+            'approved': [order.id for order in approved],
+            'failed': {str(order_id): reason for order_id, reason in failures.items()},
+        })
+    
+    if approved:
+        messages.success(request, f"{len(approved)} order{'s' if len(approved) != 1 else ''} approved successfully!")
+    if failures:
+        messages.error(request, f"{len(failures)} order{'s' if len(failures) != 1 else ''} could not be approved.")
+    return redirect('sales:dealer_order_list')